@@ -3,16 +3,38 @@ Main Flask application for API Backend
 Enterprise-grade RESTful API for teaching and practicing API testing
 """
 from flask import Flask, request
-from flask_jwt_extended import JWTManager, create_access_token
+from flask_jwt_extended import JWTManager, create_access_token, create_refresh_token, get_jwt
 from flask_cors import CORS
 from datetime import datetime
+from threading import Lock
 import os
 
 from config import Config
-from models_sqlite import UserStore, init_db
-from validators import validate_user_data, validate_login_data, validate_user_id, ValidationError
-from responses import success_response, error_response
-from auth import jwt_required_custom, admin_required, get_current_user_info
+from models_sqlite import db, UserStore, DuplicateEmailError, init_db, init_schema, user_etag, USER_FIELDS
+from validators import (
+    validate_user_data, login_email, normalize_email, validate_user_id,
+    validate_pagination_params, validate_fields, ValidationError,
+    email_cache, email_validation_stats
+)
+from responses import (
+    success_response, error_response, raw_json_response, not_modified_response,
+    ndjson_stream_response, json_array_stream_response, set_json_backend,
+    static_error_response, method_not_allowed_response,
+    NOT_FOUND_ERROR, INTERNAL_SERVER_ERROR, TOKEN_EXPIRED_ERROR, INVALID_TOKEN_ERROR,
+    TOKEN_REVOKED_ERROR, MISSING_TOKEN_ERROR, MISSING_BODY_ERROR, DUPLICATE_EMAIL_ERROR, INVALID_FILTER_ERROR
+)
+from handlers import (
+    token_claims, login_data, revocation_data, user_not_found, parse_role_filter,
+    users_collection_etag, users_page_data, parse_bulk_items, check_bulk_items,
+    bulk_create_result, parse_delete_ids, bulk_delete_data, jwks_body, NDJSON_MIMETYPE,
+    LOGIN_USER_NOT_FOUND_ERROR, INVALID_FORMAT_ERROR, REVOCATION_DISABLED_ERROR
+)
+from metrics import MetricsRegistry, init_metrics, PROMETHEUS_CONTENT_TYPE
+import auth
+from auth import (
+    jwt_required_custom, admin_required, refresh_token_required, any_token_required,
+    get_current_user_info, init_auth, verified_tokens
+)
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -20,19 +42,59 @@ app.config.from_object(Config)
 
 # SQLite Database Configuration
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'users.db')
+database_path = os.environ.get('DATABASE_PATH') or os.path.join(basedir, 'users.db')
+app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + database_path
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Select the JSON encoder used by all responses
+set_json_backend(app.config['JSON_BACKEND'])
+
+# Size the email normalization memo
+email_cache.configure(max_size=app.config['EMAIL_CACHE_MAX_SIZE'])
+
 # Initialize extensions
 CORS(app)
 jwt = JWTManager(app)
+keyset = init_auth(app, jwt)
+
+# Public keys for verification-only replicas, encoded once
+JWKS_BODY = jwks_body(keyset)
 
-# Initialize database
-init_db(app)
+# Initialize database (schema creation and seeding wait for the first
+# request when DB_LAZY_INIT is set, keeping imports and cold starts cheap)
+init_db(app, create_schema=not app.config['DB_LAZY_INIT'])
+_schema_ready = not app.config['DB_LAZY_INIT']
+_schema_lock = Lock()
 
 # Create user store instance
 user_store = UserStore()
 
+# Request latency, status code and query metrics for GET /metrics
+request_metrics = MetricsRegistry(
+    multiprocess_dir=app.config['METRICS_MULTIPROC_DIR'],
+    sync_interval=app.config['METRICS_SYNC_SECONDS']
+)
+if app.config['METRICS_ENABLED']:
+    with app.app_context():
+        init_metrics(app, db.engine, request_metrics)
+
+
+def ensure_schema():
+    """Create tables and seed data once, if init_db deferred it"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if not _schema_ready:
+            init_schema(app)
+            _schema_ready = True
+
+
+@app.before_request
+def before_first_use():
+    """Make sure the schema exists before any route touches the database"""
+    ensure_schema()
+
 
 # ============================================================================
 # ERROR HANDLERS
@@ -41,31 +103,19 @@ user_store = UserStore()
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors"""
-    return error_response(
-        message="The requested resource was not found",
-        error_code="NOT_FOUND",
-        status_code=404
-    )
+    return static_error_response(NOT_FOUND_ERROR)
 
 
 @app.errorhandler(405)
 def method_not_allowed(error):
     """Handle 405 errors"""
-    return error_response(
-        message=f"Method {request.method} not allowed for this endpoint",
-        error_code="METHOD_NOT_ALLOWED",
-        status_code=405
-    )
+    return method_not_allowed_response(request.method)
 
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors"""
-    return error_response(
-        message="Internal server error occurred",
-        error_code="INTERNAL_SERVER_ERROR",
-        status_code=500
-    )
+    return static_error_response(INTERNAL_SERVER_ERROR)
 
 
 # ============================================================================
@@ -75,31 +125,25 @@ def internal_error(error):
 @jwt.expired_token_loader
 def expired_token_callback(jwt_header, jwt_payload):
     """Handle expired JWT tokens"""
-    return error_response(
-        message="Token has expired. Please login again.",
-        error_code="TOKEN_EXPIRED",
-        status_code=401
-    )
+    return static_error_response(TOKEN_EXPIRED_ERROR)
 
 
 @jwt.invalid_token_loader
 def invalid_token_callback(error):
     """Handle invalid JWT tokens"""
-    return error_response(
-        message="Invalid token. Please provide a valid authentication token.",
-        error_code="INVALID_TOKEN",
-        status_code=401
-    )
+    return static_error_response(INVALID_TOKEN_ERROR)
+
+
+@jwt.revoked_token_loader
+def revoked_token_callback(jwt_header, jwt_payload):
+    """Handle revoked JWT tokens"""
+    return static_error_response(TOKEN_REVOKED_ERROR)
 
 
 @jwt.unauthorized_loader
 def missing_token_callback(error):
     """Handle missing JWT tokens"""
-    return error_response(
-        message="Authorization token is missing. Please include a valid token in the request.",
-        error_code="MISSING_TOKEN",
-        status_code=401
-    )
+    return static_error_response(MISSING_TOKEN_ERROR)
 
 
 # ============================================================================
@@ -113,12 +157,33 @@ def health_check():
         data={
             "status": "healthy",
             "timestamp": datetime.utcnow().isoformat(),
-            "version": "1.0.0"
+            "version": "1.0.0",
+            "user_cache": user_store.cache.stats(),
+            "login_cache": user_store.login_cache.stats(),
+            "token_cache": verified_tokens.stats(),
+            "email_cache": email_validation_stats()
         },
         message="API is running successfully"
     )
 
 
+@app.route('/.well-known/jwks.json', methods=['GET'])
+def jwks():
+    """Public keys that verify this API's tokens, as a JWKS document"""
+    response = raw_json_response(JWKS_BODY)
+    response.headers['Cache-Control'] = f"public, max-age={app.config['JWKS_MAX_AGE_SECONDS']}"
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Request and database metrics in Prometheus text format"""
+    return app.response_class(
+        request_metrics.render(),
+        content_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
 @app.route('/error', methods=['GET'])
 def simulate_error():
     """Endpoint to simulate internal server error for testing"""
@@ -144,6 +209,7 @@ def login():
             "status": "success",
             "data": {
                 "token": "jwt_token_here",
+                "refresh_token": "refresh_token_here",
                 "user": {...}
             },
             "message": "Login successful"
@@ -154,51 +220,34 @@ def login():
         data = request.get_json()
         
         if not data:
-            return error_response(
-                message="Request body is required",
-                error_code="MISSING_BODY",
-                status_code=400
-            )
+            return static_error_response(MISSING_BODY_ERROR)
         
-        # Validate login data
-        validated_data = validate_login_data(data)
-        email = validated_data["email"]
-        
-        # Find user by email
-        user = user_store.get_user_by_email(email)
+        # Find user by email (normalization only runs on a cache miss)
+        user = user_store.get_login_user(
+            login_email(data),
+            lambda raw_email: normalize_email(raw_email.strip())
+        )
         
         if not user:
-            return error_response(
-                message="User not found with provided email",
-                error_code="USER_NOT_FOUND",
-                status_code=404
-            )
+            return static_error_response(LOGIN_USER_NOT_FOUND_ERROR)
         
         # Create JWT token with user information
         # Using user_id as the identity (simpler approach)
         identity = str(user["id"])
-        
-        additional_claims = {
-            "role": user["role"],
-            "email": user["email"]
-        }
+        additional_claims = token_claims(user)
         
         access_token = create_access_token(
             identity=identity,
             additional_claims=additional_claims
         )
+        refresh_token = create_refresh_token(
+            identity=identity,
+            additional_claims=additional_claims
+        )
         
         # Return success response
         return success_response(
-            data={
-                "token": access_token,
-                "user": {
-                    "id": user["id"],
-                    "name": user["name"],
-                    "email": user["email"],
-                    "role": user["role"]
-                }
-            },
+            data=login_data(user, access_token, refresh_token),
             message="Login successful"
         )
     
@@ -217,6 +266,80 @@ def login():
         )
 
 
+@app.route('/refresh', methods=['POST'])
+@refresh_token_required()
+def refresh():
+    """
+    Refresh endpoint - Issues a new access token from a refresh token
+    
+    The new token is minted from the refresh token's claims alone, without
+    a database lookup or email validation. The role claim is therefore the
+    one from login: a demoted or deleted user keeps it until the refresh
+    token expires (JWT_REFRESH_TOKEN_DAYS) or is revoked.
+    
+    Headers:
+        Authorization: Bearer <refresh_token>
+    
+    Response:
+        {
+            "status": "success",
+            "data": {
+                "token": "jwt_token_here"
+            },
+            "message": "Token refreshed"
+        }
+    """
+    try:
+        claims = get_jwt()
+        access_token = create_access_token(
+            identity=claims["sub"],
+            additional_claims=token_claims(claims)
+        )
+        
+        return success_response(
+            data={"token": access_token},
+            message="Token refreshed"
+        )
+    
+    except Exception as e:
+        app.logger.error(f"Refresh error: {str(e)}")
+        return error_response(
+            message="An error occurred while refreshing the token",
+            error_code="REFRESH_ERROR",
+            status_code=500
+        )
+
+
+@app.route('/logout', methods=['POST'])
+@any_token_required()
+def logout():
+    """
+    Logout endpoint - Revokes the presented access or refresh token
+    
+    Headers:
+        Authorization: Bearer <token>
+    """
+    if auth.revoked_tokens is None:
+        return static_error_response(REVOCATION_DISABLED_ERROR)
+    
+    try:
+        claims = get_jwt()
+        auth.revoked_tokens.revoke(claims["jti"], claims["exp"])
+        
+        return success_response(
+            data=revocation_data(claims),
+            message="Token revoked"
+        )
+    
+    except Exception as e:
+        app.logger.error(f"Logout error: {str(e)}")
+        return error_response(
+            message="An error occurred while revoking the token",
+            error_code="LOGOUT_ERROR",
+            status_code=500
+        )
+
+
 # ============================================================================
 # USER MANAGEMENT ENDPOINTS
 # ============================================================================
@@ -247,26 +370,17 @@ def create_user():
         data = request.get_json()
         
         if not data:
-            return error_response(
-                message="Request body is required",
-                error_code="MISSING_BODY",
-                status_code=400
-            )
+            return static_error_response(MISSING_BODY_ERROR)
         
         # Validate user data
         validated_data = validate_user_data(data, is_update=False)
         
-        # Check if email already exists
-        if user_store.email_exists(validated_data["email"]):
-            return error_response(
-                message="Email already exists. Please use a different email.",
-                error_code="DUPLICATE_EMAIL",
-                status_code=409
-            )
-        
-        # Create user
+        # Create user (None means the email is already taken)
         new_user = user_store.create_user(validated_data)
         
+        if not new_user:
+            return static_error_response(DUPLICATE_EMAIL_ERROR)
+        
         return success_response(
             data=new_user,
             message="User created successfully",
@@ -277,7 +391,8 @@ def create_user():
         return error_response(
             message=e.message,
             error_code=e.error_code,
-            status_code=400
+            status_code=400,
+            errors=e.errors
         )
     except Exception as e:
         app.logger.error(f"Create user error: {str(e)}")
@@ -288,45 +403,122 @@ def create_user():
         )
 
 
+def _read_bulk_items():
+    """Read the items of a bulk request body (see handlers.parse_bulk_items)"""
+    ndjson = request.mimetype == NDJSON_MIMETYPE
+    body = request.get_data(as_text=True) if ndjson else request.get_json(silent=True)
+    return parse_bulk_items(body, ndjson, app.config['USERS_BULK_MAX_ITEMS'])
+
+
+@app.route('/users/bulk', methods=['POST'])
+@jwt_required_custom()
+def create_users_bulk():
+    """
+    Create many users in one request and one database transaction
+    
+    Request Body:
+        [
+            {"name": "John Doe", "email": "john@example.com", "age": 25},
+            ...
+        ]
+        or the same objects as NDJSON (Content-Type: application/x-ndjson)
+    
+    Response (201 if every user was created, 207 otherwise):
+        {
+            "status": "success",
+            "data": {
+                "results": [
+                    {"index": 0, "status": "created", "user": {...}},
+                    {"index": 1, "status": "error", "error_code": "DUPLICATE_EMAIL", "message": "..."}
+                ],
+                "created": 1,
+                "failed": 1
+            },
+            "message": "Created 1 of 2 user(s)"
+        }
+    """
+    try:
+        items = _read_bulk_items()
+        
+        # Validate every item up front; invalid ones are reported, not fatal
+        results, valid_positions, valid_users = check_bulk_items(items)
+        
+        created_users = user_store.create_users_bulk(valid_users) if valid_users else []
+        
+        data, message, status_code = bulk_create_result(results, valid_positions, created_users)
+        return success_response(data=data, message=message, status_code=status_code)
+    
+    except ValidationError as e:
+        return error_response(
+            message=e.message,
+            error_code=e.error_code,
+            status_code=400
+        )
+    except Exception as e:
+        app.logger.error(f"Bulk create users error: {str(e)}")
+        return error_response(
+            message="An error occurred while creating users",
+            error_code="BULK_CREATE_ERROR",
+            status_code=500
+        )
+
+
 @app.route('/users', methods=['GET'])
 def get_all_users():
     """
-    Get all users
+    Get users, one page at a time (keyset pagination on user ID)
     
     Query Parameters:
         role: Filter by role (optional)
+        limit: Page size (optional, defaults to USERS_PAGE_DEFAULT_LIMIT)
+        cursor: Opaque cursor from a previous response's next_cursor (optional)
+        after_id: Return users with ID greater than this value (optional)
+        fields: Comma-separated fields to return, e.g. "id,email,role" (optional)
     
     Response:
         {
             "status": "success",
-            "data": [...array of users...],
+            "data": {
+                "users": [...array of users...],
+                "count": 2,
+                "next_cursor": "aWQ6Mg" // null on the last page
+            },
             "message": "Users retrieved successfully"
         }
     """
     try:
-        # Get all users
-        users = user_store.get_all_users()
-        
-        # Apply role filter if provided
-        role_filter = request.args.get('role')
-        if role_filter:
-            role_filter = role_filter.lower()
-            if role_filter not in ['admin', 'user']:
-                return error_response(
-                    message="Invalid role filter. Must be 'admin' or 'user'",
-                    error_code="INVALID_FILTER",
-                    status_code=400
-                )
-            users = [u for u in users if u['role'] == role_filter]
+        limit, after_id = validate_pagination_params(
+            request.args,
+            default_limit=app.config['USERS_PAGE_DEFAULT_LIMIT'],
+            max_limit=app.config['USERS_PAGE_MAX_LIMIT']
+        )
+        fields = validate_fields(request.args.get('fields'), USER_FIELDS)
+        role_filter = parse_role_filter(request.args.get('role'))
         
-        return success_response(
-            data={
-                "users": users,
-                "count": len(users)
-            },
-            message=f"Retrieved {len(users)} user(s) successfully"
+        # The collection ETag changes with the table version and the page asked for
+        etag = users_collection_etag(user_store.get_users_version(), request.query_string)
+        if request.if_none_match.contains(etag):
+            return not_modified_response(etag)
+        
+        # Get one page of users, filtered in the query
+        users, last_id = user_store.get_users_page(
+            limit,
+            after_id=after_id,
+            role=role_filter,
+            fields=fields
         )
+        
+        data, message = users_page_data(users, last_id)
+        response, status_code = success_response(data=data, message=message)
+        response.set_etag(etag)
+        return response, status_code
     
+    except ValidationError as e:
+        return error_response(
+            message=e.message,
+            error_code=e.error_code,
+            status_code=400
+        )
     except Exception as e:
         app.logger.error(f"Get users error: {str(e)}")
         return error_response(
@@ -336,11 +528,76 @@ def get_all_users():
         )
 
 
+@app.route('/users/export', methods=['GET'])
+def export_users():
+    """
+    Stream every user without building the full list in memory
+    
+    Query Parameters:
+        format: "ndjson" (default, one user object per line) or "json"
+        role: Filter by role (optional)
+    
+    Response (format=json):
+        {
+            "status": "success",
+            "message": "Users exported successfully",
+            "data": {
+                "users": [...array of users...],
+                "count": 2
+            }
+        }
+    """
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ['ndjson', 'json']:
+        return static_error_response(INVALID_FORMAT_ERROR)
+    
+    try:
+        role_filter = parse_role_filter(request.args.get('role'))
+    except ValidationError:
+        return static_error_response(INVALID_FILTER_ERROR)
+    
+    users = user_store.iter_users(
+        batch_size=app.config['USERS_EXPORT_BATCH_SIZE'],
+        role=role_filter
+    )
+    
+    if export_format == 'json':
+        return json_array_stream_response(
+            users,
+            message="Users exported successfully",
+            key="users"
+        )
+    return ndjson_stream_response(users)
+
+
+def _get_user_fields(user_id, fields):
+    """Respond with a sparse fieldset of one user (bypasses the body cache)"""
+    if request.if_none_match:
+        etag = user_store.get_user_etag(user_id, fields)
+        if etag and request.if_none_match.contains(etag):
+            return not_modified_response(etag)
+    
+    user, etag = user_store.get_user_fields(user_id, fields)
+    
+    if not user:
+        return error_response(**user_not_found(user_id))
+    
+    response, status_code = success_response(
+        data=user,
+        message="User retrieved successfully"
+    )
+    response.set_etag(etag)
+    return response, status_code
+
+
 @app.route('/users/<user_id>', methods=['GET'])
 def get_user_by_id(user_id):
     """
     Get a specific user by ID
     
+    Query Parameters:
+        fields: Comma-separated fields to return, e.g. "id,email,role" (optional)
+    
     Response:
         {
             "status": "success",
@@ -351,21 +608,42 @@ def get_user_by_id(user_id):
     try:
         # Validate user ID
         validated_id = validate_user_id(user_id)
+        fields = validate_fields(request.args.get('fields'), USER_FIELDS)
+        
+        if fields:
+            return _get_user_fields(validated_id, fields)
+        
+        # Serve the cached response body when we have one
+        cached = user_store.cache.get(validated_id)
+        if cached is not None:
+            etag, body = cached
+            if request.if_none_match.contains(etag):
+                return not_modified_response(etag)
+            response = raw_json_response(body)
+            response.set_etag(etag)
+            return response
+        
+        # Answer conditional requests from updated_at before loading the row
+        if request.if_none_match:
+            etag = user_store.get_user_etag(validated_id)
+            if etag and request.if_none_match.contains(etag):
+                return not_modified_response(etag)
         
         # Get user
+        generation = user_store.cache.generation
         user = user_store.get_user_by_id(validated_id)
         
         if not user:
-            return error_response(
-                message=f"User with ID {validated_id} not found",
-                error_code="USER_NOT_FOUND",
-                status_code=404
-            )
+            return error_response(**user_not_found(validated_id))
         
-        return success_response(
+        response, status_code = success_response(
             data=user,
             message="User retrieved successfully"
         )
+        etag = user_etag(user["id"], user["updated_at"])
+        response.set_etag(etag)
+        user_store.cache.set(validated_id, (etag, response.get_data()), generation=generation)
+        return response, status_code
     
     except ValidationError as e:
         return error_response(
@@ -407,40 +685,21 @@ def update_user(user_id):
         # Validate user ID
         validated_id = validate_user_id(user_id)
         
-        # Check if user exists
-        existing_user = user_store.get_user_by_id(validated_id)
-        if not existing_user:
-            return error_response(
-                message=f"User with ID {validated_id} not found",
-                error_code="USER_NOT_FOUND",
-                status_code=404
-            )
-        
         # Get request data
         data = request.get_json()
         
         if not data:
-            return error_response(
-                message="Request body is required",
-                error_code="MISSING_BODY",
-                status_code=400
-            )
+            return static_error_response(MISSING_BODY_ERROR)
         
         # Validate user data for update
         validated_data = validate_user_data(data, is_update=True)
         
-        # Check if email is being updated and if it already exists
-        if "email" in validated_data:
-            if user_store.email_exists(validated_data["email"], exclude_user_id=validated_id):
-                return error_response(
-                    message="Email already exists. Please use a different email.",
-                    error_code="DUPLICATE_EMAIL",
-                    status_code=409
-                )
-        
-        # Update user
+        # Update user in a single statement (None means it does not exist)
         updated_user = user_store.update_user(validated_id, validated_data)
         
+        if not updated_user:
+            return error_response(**user_not_found(validated_id))
+        
         return success_response(
             data=updated_user,
             message="User updated successfully"
@@ -450,8 +709,11 @@ def update_user(user_id):
         return error_response(
             message=e.message,
             error_code=e.error_code,
-            status_code=400
+            status_code=400,
+            errors=e.errors
         )
+    except DuplicateEmailError:
+        return static_error_response(DUPLICATE_EMAIL_ERROR)
     except Exception as e:
         app.logger.error(f"Update user error: {str(e)}")
         return error_response(
@@ -483,11 +745,7 @@ def delete_user(user_id):
         deleted_user = user_store.delete_user(validated_id)
         
         if not deleted_user:
-            return error_response(
-                message=f"User with ID {validated_id} not found",
-                error_code="USER_NOT_FOUND",
-                status_code=404
-            )
+            return error_response(**user_not_found(validated_id))
         
         return success_response(
             data=deleted_user,
@@ -509,6 +767,55 @@ def delete_user(user_id):
         )
 
 
+@app.route('/users', methods=['DELETE'])
+@jwt_required_custom()
+@admin_required()
+def delete_users_bulk():
+    """
+    Delete many users at once (Admin only)
+    
+    Request Body:
+        {
+            "ids": [3, 4, 5]
+        }
+    
+    Response:
+        {
+            "status": "success",
+            "data": {
+                "deleted": [...deleted user objects...],
+                "not_found": [5],
+                "count": 2
+            },
+            "message": "Deleted 2 user(s) successfully"
+        }
+    """
+    try:
+        validated_ids = parse_delete_ids(
+            request.get_json(silent=True),
+            app.config['USERS_BULK_MAX_ITEMS']
+        )
+        
+        deleted_users = user_store.delete_users(validated_ids)
+        
+        data, message = bulk_delete_data(validated_ids, deleted_users)
+        return success_response(data=data, message=message)
+    
+    except ValidationError as e:
+        return error_response(
+            message=e.message,
+            error_code=e.error_code,
+            status_code=400
+        )
+    except Exception as e:
+        app.logger.error(f"Bulk delete users error: {str(e)}")
+        return error_response(
+            message="An error occurred while deleting users",
+            error_code="BULK_DELETE_ERROR",
+            status_code=500
+        )
+
+
 # ============================================================================
 # RESET ENDPOINT (FOR TESTING)
 # ============================================================================
@@ -546,9 +853,9 @@ if __name__ == '__main__':
     print("\n" + "="*60)
     print("API Backend Server Starting...")
     print("="*60)
-    print(f"Environment: Development")
+    print(f"Environment: Development (use gunicorn for production, see gunicorn.conf.py)")
     print(f"Server: http://127.0.0.1:5000")
     print(f"Health Check: http://127.0.0.1:5000/health")
     print("="*60 + "\n")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=os.environ.get('FLASK_DEBUG', '1') == '1', host='0.0.0.0', port=5000)
@@ -0,0 +1,578 @@
+"""
+ASGI (async) entry point for API Backend
+
+Serves the same routes, envelopes and JWT behaviour as app.py with async
+handlers and an aiosqlite-backed store, so one process can hold many
+concurrent connections while requests wait on the database.
+
+Run with any ASGI server, for example:
+    hypercorn asgi:app --bind 0.0.0.0:5000
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+"""
+from quart import Quart, request
+from datetime import datetime
+import os
+
+from config import Config
+from models_sqlite import DuplicateEmailError, user_etag, USER_FIELDS
+from models_async import AsyncUserStore
+from validators import (
+    validate_user_data, validate_login_data, validate_user_id,
+    validate_pagination_params, validate_fields, ValidationError
+)
+from metrics import MetricsRegistry, init_metrics_async, PROMETHEUS_CONTENT_TYPE
+from responses import (
+    set_json_backend,
+    NOT_FOUND_ERROR, INTERNAL_SERVER_ERROR, MISSING_BODY_ERROR,
+    DUPLICATE_EMAIL_ERROR, INVALID_FILTER_ERROR
+)
+from responses_async import (
+    success_response, error_response, static_error_response, method_not_allowed_response,
+    not_modified_response, ndjson_stream_response, json_array_stream_response,
+    raw_json_response
+)
+from handlers import (
+    token_claims, login_data, revocation_data, user_not_found, parse_role_filter,
+    users_collection_etag, users_page_data, parse_bulk_items, check_bulk_items,
+    bulk_create_result, parse_delete_ids, bulk_delete_data, cors_headers, jwks_body,
+    NDJSON_MIMETYPE, LOGIN_USER_NOT_FOUND_ERROR, INVALID_FORMAT_ERROR, REVOCATION_DISABLED_ERROR
+)
+from auth_async import (
+    jwt_required_custom, admin_required, create_access_token, create_refresh_token, get_jwt,
+    keyset, revoked_tokens
+)
+
+# Initialize Quart app
+app = Quart(__name__)
+app.config.from_object(Config)
+
+# SQLite Database Configuration (same file as the WSGI app)
+basedir = os.path.abspath(os.path.dirname(__file__))
+database_path = os.environ.get('DATABASE_PATH') or os.path.join(basedir, 'users.db')
+database_url = 'sqlite+aiosqlite:///' + database_path
+
+# Select the JSON encoder used by all responses
+set_json_backend(app.config['JSON_BACKEND'])
+
+# Public keys for verification-only replicas, encoded once
+JWKS_BODY = jwks_body(keyset)
+
+# Create user store instance
+user_store = AsyncUserStore(database_url, app.config)
+
+# Request latency, status code and query metrics for GET /metrics
+request_metrics = MetricsRegistry(
+    multiprocess_dir=app.config['METRICS_MULTIPROC_DIR'],
+    sync_interval=app.config['METRICS_SYNC_SECONDS']
+)
+if app.config['METRICS_ENABLED']:
+    init_metrics_async(app, user_store.engine, request_metrics)
+
+
+@app.before_serving
+async def startup():
+    """Initialize the database before accepting connections"""
+    await user_store.init_db()
+
+
+@app.after_serving
+async def shutdown():
+    """Release database connections"""
+    await user_store.close()
+
+
+@app.after_request
+async def add_cors_headers(response):
+    """Allow cross-origin requests and answer preflights as flask_cors does in app.py"""
+    for name, value in cors_headers(request.method, request.headers).items():
+        if name == "Vary":
+            response.vary.add(value)
+        else:
+            response.headers.setdefault(name, value)
+    return response
+
+
+# ============================================================================
+# ERROR HANDLERS
+# ============================================================================
+
+@app.errorhandler(404)
+async def not_found(error):
+    """Handle 404 errors"""
+    return static_error_response(NOT_FOUND_ERROR)
+
+
+@app.errorhandler(405)
+async def method_not_allowed(error):
+    """Handle 405 errors"""
+    return method_not_allowed_response(request.method)
+
+
+@app.errorhandler(500)
+async def internal_error(error):
+    """Handle 500 errors"""
+    return static_error_response(INTERNAL_SERVER_ERROR)
+
+
+# ============================================================================
+# UTILITY ENDPOINTS
+# ============================================================================
+
+@app.route('/health', methods=['GET'])
+async def health_check():
+    """Health check endpoint"""
+    return success_response(
+        data={
+            "status": "healthy",
+            "timestamp": datetime.utcnow().isoformat(),
+            "version": "1.0.0"
+        },
+        message="API is running successfully"
+    )
+
+
+@app.route('/.well-known/jwks.json', methods=['GET'])
+async def jwks():
+    """Public keys that verify this API's tokens, as a JWKS document"""
+    response = raw_json_response(JWKS_BODY)
+    response.headers['Cache-Control'] = f"public, max-age={app.config['JWKS_MAX_AGE_SECONDS']}"
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+async def metrics():
+    """Request and database metrics in Prometheus text format"""
+    return app.response_class(
+        request_metrics.render(),
+        content_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
+@app.route('/error', methods=['GET'])
+async def simulate_error():
+    """Endpoint to simulate internal server error for testing"""
+    raise Exception("Simulated internal server error for testing purposes")
+
+
+# ============================================================================
+# AUTHENTICATION ENDPOINTS
+# ============================================================================
+
+@app.route('/login', methods=['POST'])
+async def login():
+    """Login endpoint - Generates JWT token (see app.login)"""
+    try:
+        data = await request.get_json()
+        
+        if not data:
+            return static_error_response(MISSING_BODY_ERROR)
+        
+        validated_data = validate_login_data(data)
+        user = await user_store.get_user_by_email(validated_data["email"])
+        
+        if not user:
+            return static_error_response(LOGIN_USER_NOT_FOUND_ERROR)
+        
+        additional_claims = token_claims(user)
+        access_token = create_access_token(str(user["id"]), additional_claims)
+        refresh_token = create_refresh_token(str(user["id"]), additional_claims)
+        
+        return success_response(
+            data=login_data(user, access_token, refresh_token),
+            message="Login successful"
+        )
+    
+    except ValidationError as e:
+        return error_response(
+            message=e.message,
+            error_code=e.error_code,
+            status_code=400
+        )
+    except Exception as e:
+        app.logger.error(f"Login error: {str(e)}")
+        return error_response(
+            message="An error occurred during login",
+            error_code="LOGIN_ERROR",
+            status_code=500
+        )
+
+
+@app.route('/refresh', methods=['POST'])
+@jwt_required_custom(token_type="refresh")
+async def refresh():
+    """Refresh endpoint - Issues a new access token from a refresh token (see app.refresh)"""
+    try:
+        claims = get_jwt()
+        access_token = create_access_token(claims["sub"], token_claims(claims))
+        
+        return success_response(
+            data={"token": access_token},
+            message="Token refreshed"
+        )
+    
+    except Exception as e:
+        app.logger.error(f"Refresh error: {str(e)}")
+        return error_response(
+            message="An error occurred while refreshing the token",
+            error_code="REFRESH_ERROR",
+            status_code=500
+        )
+
+
+@app.route('/logout', methods=['POST'])
+@jwt_required_custom(token_type=None)
+async def logout():
+    """Logout endpoint - Revokes the presented access or refresh token (see app.logout)"""
+    if revoked_tokens is None:
+        return static_error_response(REVOCATION_DISABLED_ERROR)
+    
+    try:
+        claims = get_jwt()
+        revoked_tokens.revoke(claims["jti"], claims["exp"])
+        
+        return success_response(
+            data=revocation_data(claims),
+            message="Token revoked"
+        )
+    
+    except Exception as e:
+        app.logger.error(f"Logout error: {str(e)}")
+        return error_response(
+            message="An error occurred while revoking the token",
+            error_code="LOGOUT_ERROR",
+            status_code=500
+        )
+
+
+# ============================================================================
+# USER MANAGEMENT ENDPOINTS
+# ============================================================================
+
+@app.route('/users', methods=['POST'])
+@jwt_required_custom()
+async def create_user():
+    """Create a new user (see app.create_user)"""
+    try:
+        data = await request.get_json()
+        
+        if not data:
+            return static_error_response(MISSING_BODY_ERROR)
+        
+        validated_data = validate_user_data(data, is_update=False)
+        
+        new_user = await user_store.create_user(validated_data)
+        
+        if not new_user:
+            return static_error_response(DUPLICATE_EMAIL_ERROR)
+        
+        return success_response(
+            data=new_user,
+            message="User created successfully",
+            status_code=201
+        )
+    
+    except ValidationError as e:
+        return error_response(
+            message=e.message,
+            error_code=e.error_code,
+            status_code=400,
+            errors=e.errors
+        )
+    except Exception as e:
+        app.logger.error(f"Create user error: {str(e)}")
+        return error_response(
+            message="An error occurred while creating the user",
+            error_code="CREATE_USER_ERROR",
+            status_code=500
+        )
+
+
+async def _read_bulk_items():
+    """Read the items of a bulk request body (see handlers.parse_bulk_items)"""
+    ndjson = request.mimetype == NDJSON_MIMETYPE
+    body = await request.get_data(as_text=True) if ndjson else await request.get_json(silent=True)
+    return parse_bulk_items(body, ndjson, app.config['USERS_BULK_MAX_ITEMS'])
+
+
+@app.route('/users/bulk', methods=['POST'])
+@jwt_required_custom()
+async def create_users_bulk():
+    """Create many users in one request (see app.create_users_bulk)"""
+    try:
+        items = await _read_bulk_items()
+        
+        results, valid_positions, valid_users = check_bulk_items(items)
+        
+        created_users = await user_store.create_users_bulk(valid_users) if valid_users else []
+        
+        data, message, status_code = bulk_create_result(results, valid_positions, created_users)
+        return success_response(data=data, message=message, status_code=status_code)
+    
+    except ValidationError as e:
+        return error_response(
+            message=e.message,
+            error_code=e.error_code,
+            status_code=400
+        )
+    except Exception as e:
+        app.logger.error(f"Bulk create users error: {str(e)}")
+        return error_response(
+            message="An error occurred while creating users",
+            error_code="BULK_CREATE_ERROR",
+            status_code=500
+        )
+
+
+@app.route('/users', methods=['GET'])
+async def get_all_users():
+    """Get users, one page at a time (see app.get_all_users)"""
+    try:
+        limit, after_id = validate_pagination_params(
+            request.args,
+            default_limit=app.config['USERS_PAGE_DEFAULT_LIMIT'],
+            max_limit=app.config['USERS_PAGE_MAX_LIMIT']
+        )
+        fields = validate_fields(request.args.get('fields'), USER_FIELDS)
+        role_filter = parse_role_filter(request.args.get('role'))
+        
+        etag = users_collection_etag(await user_store.get_users_version(), request.query_string)
+        if request.if_none_match.contains(etag):
+            return not_modified_response(etag)
+        
+        users, last_id = await user_store.get_users_page(
+            limit,
+            after_id=after_id,
+            role=role_filter,
+            fields=fields
+        )
+        
+        data, message = users_page_data(users, last_id)
+        response = success_response(data=data, message=message)
+        response.set_etag(etag)
+        return response
+    
+    except ValidationError as e:
+        return error_response(
+            message=e.message,
+            error_code=e.error_code,
+            status_code=400
+        )
+    except Exception as e:
+        app.logger.error(f"Get users error: {str(e)}")
+        return error_response(
+            message="An error occurred while retrieving users",
+            error_code="GET_USERS_ERROR",
+            status_code=500
+        )
+
+
+@app.route('/users/export', methods=['GET'])
+async def export_users():
+    """Stream every user (see app.export_users)"""
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ['ndjson', 'json']:
+        return static_error_response(INVALID_FORMAT_ERROR)
+    
+    try:
+        role_filter = parse_role_filter(request.args.get('role'))
+    except ValidationError:
+        return static_error_response(INVALID_FILTER_ERROR)
+    
+    users = user_store.iter_users(
+        batch_size=app.config['USERS_EXPORT_BATCH_SIZE'],
+        role=role_filter
+    )
+    
+    if export_format == 'json':
+        return json_array_stream_response(
+            users,
+            message="Users exported successfully",
+            key="users"
+        )
+    return ndjson_stream_response(users)
+
+
+@app.route('/users/<user_id>', methods=['GET'])
+async def get_user_by_id(user_id):
+    """Get a specific user by ID (see app.get_user_by_id)"""
+    try:
+        validated_id = validate_user_id(user_id)
+        fields = validate_fields(request.args.get('fields'), USER_FIELDS)
+        
+        # Answer conditional requests from updated_at before loading the row
+        if request.if_none_match:
+            etag = await user_store.get_user_etag(validated_id, fields)
+            if etag and request.if_none_match.contains(etag):
+                return not_modified_response(etag)
+        
+        if fields:
+            user, etag = await user_store.get_user_fields(validated_id, fields)
+        else:
+            user = await user_store.get_user_by_id(validated_id)
+            etag = user_etag(user["id"], user["updated_at"]) if user else None
+        
+        if not user:
+            return error_response(**user_not_found(validated_id))
+        
+        response = success_response(
+            data=user,
+            message="User retrieved successfully"
+        )
+        response.set_etag(etag)
+        return response
+    
+    except ValidationError as e:
+        return error_response(
+            message=e.message,
+            error_code=e.error_code,
+            status_code=400
+        )
+    except Exception as e:
+        app.logger.error(f"Get user error: {str(e)}")
+        return error_response(
+            message="An error occurred while retrieving the user",
+            error_code="GET_USER_ERROR",
+            status_code=500
+        )
+
+
+@app.route('/users/<user_id>', methods=['PUT'])
+@jwt_required_custom()
+async def update_user(user_id):
+    """Update an existing user (see app.update_user)"""
+    try:
+        validated_id = validate_user_id(user_id)
+        
+        data = await request.get_json()
+        
+        if not data:
+            return static_error_response(MISSING_BODY_ERROR)
+        
+        validated_data = validate_user_data(data, is_update=True)
+        
+        updated_user = await user_store.update_user(validated_id, validated_data)
+        
+        if not updated_user:
+            return error_response(**user_not_found(validated_id))
+        
+        return success_response(
+            data=updated_user,
+            message="User updated successfully"
+        )
+    
+    except ValidationError as e:
+        return error_response(
+            message=e.message,
+            error_code=e.error_code,
+            status_code=400,
+            errors=e.errors
+        )
+    except DuplicateEmailError:
+        return static_error_response(DUPLICATE_EMAIL_ERROR)
+    except Exception as e:
+        app.logger.error(f"Update user error: {str(e)}")
+        return error_response(
+            message="An error occurred while updating the user",
+            error_code="UPDATE_USER_ERROR",
+            status_code=500
+        )
+
+
+@app.route('/users/<user_id>', methods=['DELETE'])
+@jwt_required_custom()
+@admin_required()
+async def delete_user(user_id):
+    """Delete a user (Admin only, see app.delete_user)"""
+    try:
+        validated_id = validate_user_id(user_id)
+        
+        deleted_user = await user_store.delete_user(validated_id)
+        
+        if not deleted_user:
+            return error_response(**user_not_found(validated_id))
+        
+        return success_response(
+            data=deleted_user,
+            message="User deleted successfully"
+        )
+    
+    except ValidationError as e:
+        return error_response(
+            message=e.message,
+            error_code=e.error_code,
+            status_code=400
+        )
+    except Exception as e:
+        app.logger.error(f"Delete user error: {str(e)}")
+        return error_response(
+            message="An error occurred while deleting the user",
+            error_code="DELETE_USER_ERROR",
+            status_code=500
+        )
+
+
+@app.route('/users', methods=['DELETE'])
+@jwt_required_custom()
+@admin_required()
+async def delete_users_bulk():
+    """Delete many users at once (Admin only, see app.delete_users_bulk)"""
+    try:
+        validated_ids = parse_delete_ids(
+            await request.get_json(silent=True),
+            app.config['USERS_BULK_MAX_ITEMS']
+        )
+        
+        deleted_users = await user_store.delete_users(validated_ids)
+        
+        data, message = bulk_delete_data(validated_ids, deleted_users)
+        return success_response(data=data, message=message)
+    
+    except ValidationError as e:
+        return error_response(
+            message=e.message,
+            error_code=e.error_code,
+            status_code=400
+        )
+    except Exception as e:
+        app.logger.error(f"Bulk delete users error: {str(e)}")
+        return error_response(
+            message="An error occurred while deleting users",
+            error_code="BULK_DELETE_ERROR",
+            status_code=500
+        )
+
+
+# ============================================================================
+# RESET ENDPOINT (FOR TESTING)
+# ============================================================================
+
+@app.route('/reset', methods=['POST'])
+async def reset_data():
+    """Reset the data store to initial state (for testing purposes)"""
+    try:
+        await user_store.reset()
+        return success_response(
+            message="Data store reset to initial state successfully"
+        )
+    except Exception as e:
+        app.logger.error(f"Reset error: {str(e)}")
+        return error_response(
+            message="An error occurred while resetting the data store",
+            error_code="RESET_ERROR",
+            status_code=500
+        )
+
+
+# ============================================================================
+# APPLICATION ENTRY POINT
+# ============================================================================
+
+if __name__ == '__main__':
+    print("\n" + "="*60)
+    print("API Backend Server Starting (ASGI mode)...")
+    print("="*60)
+    print(f"Server: http://127.0.0.1:5000")
+    print(f"Health Check: http://127.0.0.1:5000/health")
+    print("="*60 + "\n")
+    
+    app.run(host='0.0.0.0', port=5000)
@@ -2,9 +2,108 @@
 Authentication and authorization utilities
 """
 from functools import wraps
-from flask import request
+import hashlib
+import time
+from flask import request, g
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
-from responses import error_response
+from cache import LRUCache
+from keys import KeySet
+from revocation import RevocationList
+from responses import (
+    static_error_response, FORBIDDEN_ERROR, TOKEN_EXPIRED_ERROR, TOKEN_REVOKED_ERROR,
+    INVALID_SIGNATURE_ERROR, UNAUTHORIZED_ERROR
+)
+
+
+# sha256 of the Authorization header -> (jwt_header, jwt_data) of a token
+# that already passed signature and claims verification
+verified_tokens = LRUCache()
+
+# Revoked token IDs, or None when JWT_REVOCATION_ENABLED is off
+revoked_tokens = None
+
+
+def revocation_list_from_config(config):
+    """Build the revocation list described by config, or None if disabled"""
+    if not config.get('JWT_REVOCATION_ENABLED'):
+        return None
+    return RevocationList(
+        path=config.get('JWT_REVOCATION_FILE'),
+        sync_interval=config.get('JWT_REVOCATION_SYNC_SECONDS', 30)
+    )
+
+
+def init_auth(app, jwt_manager):
+    """
+    Load the signing keys and revocation list, and size the verified-token cache
+    
+    Args:
+        app: Flask application
+        jwt_manager: The app's JWTManager
+    
+    Returns:
+        KeySet used to sign and verify tokens
+    """
+    keyset = KeySet.from_config(app.config)
+    app.config['JWT_DECODE_ALGORITHMS'] = [keyset.algorithm]
+    
+    # Hand flask_jwt_extended parsed key objects, picked by the "kid" header
+    jwt_manager.encode_key_loader(lambda identity: keyset.signing_key())
+    jwt_manager.decode_key_loader(
+        lambda jwt_header, jwt_data: keyset.verification_key(jwt_header.get("kid"))
+    )
+    jwt_manager.additional_headers_loader(lambda identity: keyset.signing_headers())
+    
+    global revoked_tokens
+    revoked_tokens = revocation_list_from_config(app.config)
+    if revoked_tokens is not None:
+        jwt_manager.token_in_blocklist_loader(
+            lambda jwt_header, jwt_data: revoked_tokens.is_revoked(jwt_data["jti"])
+        )
+    
+    verified_tokens.configure(
+        max_size=app.config.get('TOKEN_CACHE_MAX_SIZE', 1024),
+        ttl=app.config.get('TOKEN_CACHE_TTL_SECONDS', 300)
+    )
+    return keyset
+
+
+def verify_token():
+    """
+    Verify the request's access token at most once per request
+    
+    The result is stored where flask_jwt_extended keeps it, so get_jwt()
+    works as usual and a second call in the same request is free. Across
+    requests, a token that verified before is served from verified_tokens
+    until the cache TTL or the token's exp, whichever comes first.
+    
+    Raises:
+        Whatever verify_jwt_in_request() raises for a missing or bad token
+    """
+    if g.get("_jwt_extended_jwt"):
+        return
+    
+    authorization = request.headers.get("Authorization")
+    key = hashlib.sha256(authorization.encode()).digest() if authorization else None
+    
+    cached = verified_tokens.get(key) if key else None
+    if cached is not None:
+        jwt_header, jwt_data = cached
+        revoked = revoked_tokens is not None and revoked_tokens.is_revoked(jwt_data["jti"])
+        if not revoked and (jwt_data.get("exp") is None or jwt_data["exp"] > time.time()):
+            g._jwt_extended_jwt_user = None
+            g._jwt_extended_jwt_header = jwt_header
+            g._jwt_extended_jwt = jwt_data
+            g._jwt_extended_jwt_location = "headers"
+            return
+    
+    verified = verify_jwt_in_request()
+    if verified is None or key is None or g.get("_jwt_extended_jwt_location") != "headers":
+        return
+    
+    jwt_header, jwt_data = verified
+    ttl = jwt_data["exp"] - time.time() if "exp" in jwt_data else None
+    verified_tokens.set(key, (jwt_header, jwt_data), ttl=ttl)
 
 
 def admin_required():
@@ -14,8 +113,9 @@ def admin_required():
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            # Verify JWT is present and valid
-            verify_jwt_in_request()
+            # Verify JWT is present and valid (free if jwt_required_custom
+            # already did it for this request)
+            verify_token()
             
             # Get the JWT claims
             claims = get_jwt()
@@ -23,11 +123,7 @@ def admin_required():
             
             # Check if user has admin role
             if role != "admin":
-                return error_response(
-                    message="Admin access required. You do not have permission to perform this action.",
-                    error_code="FORBIDDEN",
-                    status_code=403
-                )
+                return static_error_response(FORBIDDEN_ERROR)
             
             return fn(*args, **kwargs)
         return decorator
@@ -42,34 +138,65 @@ def jwt_required_custom():
         @wraps(fn)
         def decorator(*args, **kwargs):
             try:
-                verify_jwt_in_request()
+                verify_token()
                 return fn(*args, **kwargs)
             except Exception as e:
-                error_message = str(e)
-                
-                # Provide more specific error messages
-                if "expired" in error_message.lower():
-                    return error_response(
-                        message="Token has expired. Please login again.",
-                        error_code="TOKEN_EXPIRED",
-                        status_code=401
-                    )
-                elif "signature" in error_message.lower():
-                    return error_response(
-                        message="Invalid token signature.",
-                        error_code="INVALID_TOKEN",
-                        status_code=401
-                    )
-                else:
-                    return error_response(
-                        message="Authentication required. Please provide a valid token.",
-                        error_code="UNAUTHORIZED",
-                        status_code=401
-                    )
+                return static_error_response(auth_error_for(e))
         return decorator
     return wrapper
 
 
+def refresh_token_required():
+    """
+    Decorator to require a refresh token instead of an access token
+    
+    Refresh tokens bypass the verified-token cache; they are presented
+    once per access token lifetime, not on every request.
+    """
+    return _token_required(refresh=True)
+
+
+def any_token_required():
+    """Decorator to require a valid access or refresh token"""
+    return _token_required(verify_type=False)
+
+
+def _token_required(**verify_options):
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            try:
+                verify_jwt_in_request(**verify_options)
+                return fn(*args, **kwargs)
+            except Exception as e:
+                return static_error_response(auth_error_for(e))
+        return decorator
+    return wrapper
+
+
+def auth_error_for(error):
+    """
+    Pick the pre-rendered 401 body for a token verification failure
+    
+    Args:
+        error: Exception raised while verifying the token
+    
+    Returns:
+        StaticError to send to the client
+    """
+    error_message = str(error).lower()
+    
+    # Provide more specific error messages
+    if "expired" in error_message:
+        return TOKEN_EXPIRED_ERROR
+    elif "revoked" in error_message:
+        return TOKEN_REVOKED_ERROR
+    elif "signature" in error_message:
+        return INVALID_SIGNATURE_ERROR
+    else:
+        return UNAUTHORIZED_ERROR
+
+
 def get_current_user_info():
     """
     Get current authenticated user information from JWT
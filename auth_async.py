@@ -0,0 +1,160 @@
+"""
+Authentication and authorization utilities for the ASGI (Quart) deployment mode
+
+Tokens are minted and verified with PyJWT using the same keyset, algorithm
+and claim layout as flask_jwt_extended, so tokens issued by either mode
+are accepted by the other.
+"""
+from datetime import datetime, timezone
+from functools import wraps
+import uuid
+
+import jwt
+from quart import request, g
+
+from config import Config
+from auth import auth_error_for, revocation_list_from_config
+from keys import KeySet
+from responses import FORBIDDEN_ERROR
+from responses_async import static_error_response
+
+keyset = KeySet.from_config(Config)
+
+# Revoked token IDs, or None when JWT_REVOCATION_ENABLED is off
+revoked_tokens = revocation_list_from_config(vars(Config))
+
+
+class NoAuthorizationError(Exception):
+    """Raised when the request carries no usable bearer token"""
+    pass
+
+
+def _create_token(token_type, identity, additional_claims, expires_delta):
+    now = datetime.now(timezone.utc)
+    claims = {
+        "fresh": False,
+        "iat": now,
+        "jti": str(uuid.uuid4()),
+        "type": token_type,
+        "sub": identity,
+        "nbf": now,
+        "exp": now + expires_delta
+    }
+    claims.update(additional_claims or {})
+    return jwt.encode(
+        claims,
+        keyset.signing_key(),
+        algorithm=keyset.algorithm,
+        headers=keyset.signing_headers() or None
+    )
+
+
+def create_access_token(identity, additional_claims=None):
+    """
+    Create an access token with the flask_jwt_extended claim layout
+    
+    Args:
+        identity: Value stored in the "sub" claim
+        additional_claims: Extra claims such as role and email
+    
+    Returns:
+        Encoded JWT string
+    """
+    return _create_token("access", identity, additional_claims, Config.JWT_ACCESS_TOKEN_EXPIRES)
+
+
+def create_refresh_token(identity, additional_claims=None):
+    """Create a refresh token with the flask_jwt_extended claim layout"""
+    return _create_token("refresh", identity, additional_claims, Config.JWT_REFRESH_TOKEN_EXPIRES)
+
+
+def verify_jwt_in_request(token_type="access"):
+    """
+    Verify the bearer token on the current request and store its claims
+    
+    Args:
+        token_type: "access", "refresh", or None to accept either
+    
+    Returns:
+        Decoded claims
+    
+    Raises:
+        NoAuthorizationError: If the Authorization header is missing
+        jwt.PyJWTError: If the token is invalid, expired or revoked
+    """
+    if "jwt_claims" in g:
+        return g.jwt_claims
+    
+    header = request.headers.get("Authorization", "")
+    scheme, _, token = header.partition(" ")
+    if scheme != "Bearer" or not token:
+        raise NoAuthorizationError("Missing Authorization Header")
+    
+    kid = jwt.get_unverified_header(token).get("kid")
+    claims = jwt.decode(token, keyset.verification_key(kid), algorithms=[keyset.algorithm])
+    if token_type is not None and claims.get("type") != token_type:
+        raise jwt.InvalidTokenError(f"Only {token_type} tokens are allowed")
+    if revoked_tokens is not None and revoked_tokens.is_revoked(claims["jti"]):
+        raise jwt.InvalidTokenError("Token has been revoked")
+    
+    g.jwt_claims = claims
+    return claims
+
+
+def get_jwt():
+    """Get the claims of the token verified for this request"""
+    return g.get("jwt_claims", {})
+
+
+def admin_required():
+    """
+    Decorator to require admin role for accessing an endpoint
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        async def decorator(*args, **kwargs):
+            # Verify JWT is present and valid
+            claims = verify_jwt_in_request()
+            
+            # Check if user has admin role
+            if claims.get("role", "user") != "admin":
+                return static_error_response(FORBIDDEN_ERROR)
+            
+            return await fn(*args, **kwargs)
+        return decorator
+    return wrapper
+
+
+def jwt_required_custom(token_type="access"):
+    """
+    Custom JWT required decorator with better error handling
+    
+    Args:
+        token_type: "access", "refresh", or None to accept either
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        async def decorator(*args, **kwargs):
+            try:
+                verify_jwt_in_request(token_type)
+            except Exception as e:
+                return static_error_response(auth_error_for(e))
+            return await fn(*args, **kwargs)
+        return decorator
+    return wrapper
+
+
+def get_current_user_info():
+    """
+    Get current authenticated user information from JWT
+    
+    Returns:
+        Dictionary containing user_id, email, and role
+    """
+    claims = get_jwt()
+    
+    return {
+        "user_id": int(claims["sub"]),
+        "email": claims.get("email"),
+        "role": claims.get("role", "user")
+    }
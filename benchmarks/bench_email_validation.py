@@ -0,0 +1,104 @@
+"""
+Micro-benchmark for email normalization in validators.py
+
+Compares validations per second of calling email_validator directly (the
+previous behaviour) with validators.normalize_email, both with a cold memo
+(every address seen once: ASCII fast path or full validation) and a warm
+memo (repeated addresses, as with logins). Also checks that the fast path
+agrees with email_validator on every address in the corpus.
+
+Usage:
+    python benchmarks/bench_email_validation.py [--addresses 20000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from email_validator import validate_email, EmailNotValidError
+
+import validators
+
+
+def make_addresses(count, seed=1):
+    """Mostly plain addresses, with some mixed case, role mailbox, IDNA and invalid ones"""
+    rng = random.Random(seed)
+    addresses = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.80:
+            addresses.append(f"user{i}.name+tag@example{i % 50}.com")
+        elif kind < 0.87:
+            addresses.append(f"User{i}@Mail.Example.ORG")
+        elif kind < 0.90:
+            # RFC 2142 names, which email_validator lowercases
+            name = rng.choice(["Postmaster", "ABUSE", "WWW", "WebMaster", "Info", "noc"])
+            addresses.append(f"{name}@Example{i % 50}.com")
+        elif kind < 0.95:
+            addresses.append(f"user{i}@bücher{i % 7}.de")
+        else:
+            addresses.append(f"user{i}..bad@example")
+    return addresses
+
+
+def reference(email):
+    """Previous behaviour: run email_validator on every call"""
+    try:
+        return validate_email(email, check_deliverability=False).normalized
+    except EmailNotValidError:
+        return False
+
+
+def memoized(email):
+    try:
+        return validators.normalize_email(email)
+    except validators.ValidationError:
+        return False
+
+
+def bench(fn, addresses, repeat, before_each=None):
+    """Return the best validations per second over repeat runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        for email in addresses:
+            fn(email)
+        best = min(best, time.perf_counter() - start)
+    return len(addresses) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--addresses", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    addresses = make_addresses(args.addresses)
+    validators.email_cache.configure(max_size=len(addresses))
+    
+    mismatches = [
+        email for email in addresses
+        if validators._fast_normalize_email(email) not in (None, reference(email))
+    ]
+    if mismatches:
+        print(f"FAIL: fast path disagrees with email_validator on {mismatches[:5]}")
+        return 1
+    
+    before = bench(reference, addresses, args.repeat)
+    cold = bench(memoized, addresses, args.repeat, before_each=validators.email_cache.clear)
+    warm = bench(memoized, addresses, args.repeat)
+    
+    print(f"{'email_validator (before)':<28} {before:>12,.0f} validations/s")
+    print(f"{'normalize_email, cold memo':<28} {cold:>12,.0f} validations/s  ({cold / before:.1f}x)")
+    print(f"{'normalize_email, warm memo':<28} {warm:>12,.0f} validations/s  ({warm / before:.1f}x)")
+    print(validators.email_validation_stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Per-module import cost report
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters
+against a temporary database and reports the cumulative and self import
+time of each module, slowest first, so start-up regressions can be traced
+to the import that caused them. Modules that interpreter start-up already
+loads are left out.
+
+Usage:
+    python benchmarks/bench_importtime.py [--module app] [--runs 3] [--top 25] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output
+    
+    Returns:
+        Dict mapping module name to (self_us, cumulative_us, depth)
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "| imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def measure(code, env):
+    """Run code in a new interpreter and return its parsed importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ, DATABASE_PATH=os.path.join(tmpdir, "importtime.db"))
+        # Modules loaded by interpreter start-up (site, .pth hooks) are not
+        # part of the application's cost
+        startup = measure("pass", env)
+        runs = [measure(f"import {args.module}", env) for _ in range(args.runs)]
+    
+    # Median of each module over the runs it appeared in
+    report = []
+    for name in set().union(*runs) - set(startup):
+        samples = [run[name] for run in runs if name in run]
+        report.append({
+            "module": name,
+            "self_ms": statistics.median(s[0] for s in samples) / 1000,
+            "cumulative_ms": statistics.median(s[1] for s in samples) / 1000,
+            "depth": samples[0][2]
+        })
+    report.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+    
+    total = next((e["cumulative_ms"] for e in report if e["module"] == args.module), 0.0)
+    
+    if args.json:
+        print(json.dumps({
+            "module": args.module,
+            "runs": args.runs,
+            "total_ms": total,
+            "modules": report[:args.top]
+        }, indent=2))
+        return 0
+    
+    print(f"import {args.module}: {total:.1f} ms cumulative (median of {args.runs} runs)")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for entry in report[:args.top]:
+        indent = "  " * entry["depth"]
+        print(f"{entry['cumulative_ms']:>14.1f} {entry['self_ms']:>9.1f}  {indent}{entry['module']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,345 @@
+"""
+Load-testing harness for the HTTP API
+
+Starts the app against a temporary database, either in-process (werkzeug's
+threaded server) or under gunicorn with gunicorn.conf.py, seeds it with N
+users (plus a separate pool of rows for the delete scenario to remove) and
+drives each endpoint from a pool of keep-alive client threads.
+Requests per second and p50/p95/p99 latency for every scenario are printed
+as JSON so runs can be diffed between commits.
+
+Usage:
+    python benchmarks/bench_load.py [--server inprocess|gunicorn] [--users 1000]
+        [--concurrency 16] [--requests 2000] [--scenarios login get_user ...]
+        [--output results.json]
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCENARIOS = ["login", "list_users", "get_user", "create_user", "update_user", "delete_user"]
+
+
+def insert_users(db, User, prefix, count, batch_size):
+    """Insert count users with emails <prefix><n>@example.com"""
+    for start in range(0, count, batch_size):
+        rows = [
+            {
+                "name": f"Bench User {i}",
+                "email": f"{prefix}{i}@example.com",
+                "age": 18 + i % 60,
+                "role": "user"
+            }
+            for i in range(start, min(start + batch_size, count))
+        ]
+        db.session.execute(db.insert(User), rows)
+        db.session.commit()
+
+
+def seed(database_path, count, deletable=0, batch_size=10000):
+    """
+    Create the schema in database_path and insert count users, followed by
+    deletable more users that only the delete scenario touches
+    
+    Returns:
+        Tuple of (lowest, highest) ID of the seeded users, and the range
+        of IDs of the deletable ones
+    """
+    os.environ["DATABASE_PATH"] = database_path
+    from app import app, ensure_schema
+    from models_sqlite import db, User
+    
+    ensure_schema()
+    with app.app_context():
+        first_id = (db.session.scalar(db.select(db.func.max(User.id))) or 0) + 1
+        insert_users(db, User, "bench", count, batch_size)
+        last_id = db.session.scalar(db.select(db.func.max(User.id)))
+        
+        insert_users(db, User, "delete", deletable, batch_size)
+        delete_last_id = db.session.scalar(db.select(db.func.max(User.id)))
+        db.engine.dispose()
+    return first_id, last_id, range(last_id + 1, delete_last_id + 1)
+
+
+def start_inprocess(port):
+    """Serve the already imported app from a background thread"""
+    from werkzeug.serving import make_server, WSGIRequestHandler
+    from app import app
+    
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+    
+    server = make_server("127.0.0.1", port, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server.shutdown
+
+
+def start_gunicorn(port, database_path, workers, app_module):
+    """Start gunicorn in a child process and return a function that stops it"""
+    env = dict(
+        os.environ,
+        DATABASE_PATH=database_path,
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_ACCESS_LOG="/dev/null"
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", app_module],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    
+    def stop():
+        process.terminate()
+        process.wait(timeout=30)
+    
+    return stop
+
+
+def wait_until_ready(port, timeout=30):
+    """Poll GET /health until the server answers"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server on port {port} did not become ready")
+
+
+class Client:
+    """One keep-alive HTTP connection that sends JSON requests"""
+    
+    def __init__(self, port):
+        self.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    
+    def request(self, method, path, body=None, token=None):
+        """Send a request and return (status, raw response body)"""
+        headers = {}
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            self.conn.close()
+            raise
+        return response.status, data
+
+
+def login(port, email):
+    """Return an access token for email"""
+    status, data = Client(port).request("POST", "/login", {"email": email})
+    if status != 200:
+        raise RuntimeError(f"Login as {email} failed with {status}")
+    return json.loads(data)["data"]["token"]
+
+
+def build_scenarios(first_id, last_id, delete_ids, user_token, admin_token):
+    """
+    Build one request factory per scenario
+    
+    Each factory takes a random.Random and returns (method, path, body,
+    token), or None once it has nothing left to send.
+    """
+    new_emails = (f"load{n}-{time.time_ns()}@example.com" for n in itertools.count())
+    delete_ids = iter(delete_ids)
+    email_lock = threading.Lock()
+    delete_lock = threading.Lock()
+    
+    def create_user(rng):
+        with email_lock:
+            email = next(new_emails)
+        return "POST", "/users", {"name": "Load Test", "email": email, "age": 30}, user_token
+    
+    def delete_user(rng):
+        # Only the pool seeded for deleting, so every request deletes a
+        # user and the other scenarios' rows stay in place
+        with delete_lock:
+            user_id = next(delete_ids, None)
+        if user_id is None:
+            return None
+        return "DELETE", f"/users/{user_id}", None, admin_token
+    
+    return {
+        "login": lambda rng: (
+            "POST", "/login", {"email": f"bench{rng.randrange(last_id - first_id + 1)}@example.com"}, None
+        ),
+        "list_users": lambda rng: ("GET", "/users?limit=100", None, None),
+        "get_user": lambda rng: ("GET", f"/users/{rng.randint(first_id, last_id)}", None, None),
+        "create_user": create_user,
+        "update_user": lambda rng: (
+            "PUT", f"/users/{rng.randint(first_id, last_id)}", {"age": rng.randint(18, 99)}, user_token
+        ),
+        "delete_user": delete_user,
+    }
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(port, make_request, total_requests, concurrency):
+    """Send total_requests requests from concurrency threads and summarize them"""
+    latencies = []
+    statuses = {}
+    errors = 0
+    issued = itertools.count()
+    lock = threading.Lock()
+    
+    def worker(seed_value):
+        nonlocal errors
+        rng = random.Random(seed_value)
+        client = Client(port)
+        local_latencies = []
+        local_statuses = {}
+        local_errors = 0
+        while next(issued) < total_requests:
+            request = make_request(rng)
+            if request is None:
+                break
+            method, path, body, token = request
+            start = time.perf_counter()
+            try:
+                status, _ = client.request(method, path, body, token)
+            except (http.client.HTTPException, OSError):
+                local_errors += 1
+                continue
+            local_latencies.append(time.perf_counter() - start)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+            errors += local_errors
+    
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0
+    }
+
+
+def git_commit():
+    """Return the current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--server", choices=["inprocess", "gunicorn"], default="inprocess")
+    parser.add_argument("--app", default="app:app", help="WSGI app for --server gunicorn")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--users", type=int, default=1000, help="Users to seed, e.g. 1000, 100000, 1000000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--output", help="Write the JSON report to this file as well")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_path = os.path.join(tmpdir, "load.db")
+        seed_start = time.perf_counter()
+        deletable = args.requests if "delete_user" in args.scenarios else 0
+        first_id, last_id, delete_ids = seed(database_path, args.users, deletable)
+        seed_seconds = time.perf_counter() - seed_start
+        
+        if args.server == "gunicorn":
+            stop = start_gunicorn(args.port, database_path, args.workers, args.app)
+        else:
+            stop = start_inprocess(args.port)
+        
+        try:
+            wait_until_ready(args.port)
+            factories = build_scenarios(
+                first_id,
+                last_id,
+                delete_ids,
+                user_token=login(args.port, "john@example.com"),
+                admin_token=login(args.port, "admin@example.com")
+            )
+            
+            results = {}
+            for name in args.scenarios:
+                if args.warmup and name != "delete_user":
+                    run_scenario(args.port, factories[name], args.warmup, args.concurrency)
+                results[name] = run_scenario(
+                    args.port, factories[name], args.requests, args.concurrency
+                )
+                print(f"{name}: {results[name]['rps']} req/s, "
+                      f"p99 {results[name]['p99_ms']} ms", file=sys.stderr)
+        finally:
+            stop()
+    
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "server": args.server if args.server == "inprocess" else f"gunicorn {args.app} x{args.workers}",
+        "users": args.users,
+        "seed_seconds": round(seed_seconds, 3),
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "scenarios": results
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
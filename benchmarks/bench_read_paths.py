@@ -0,0 +1,105 @@
+"""
+Benchmark for the UserStore read paths
+
+Seeds a temporary SQLite database and compares reading every user through
+ORM objects and to_dict() with the Core select_users() path that
+UserStore now uses, reporting rows per second for each.
+
+Usage:
+    python benchmarks/bench_read_paths.py [--rows 100000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from config import Config
+from models_sqlite import db, init_db, User, UserStore, select_users
+
+
+def orm_read_all():
+    """Previous read path: hydrate User objects, then convert each one"""
+    users = [user.to_dict() for user in User.query.all()]
+    db.session.expunge_all()
+    return users
+
+
+def core_read_all():
+    """Core rows converted straight to dicts"""
+    return UserStore.get_all_users()
+
+
+def core_rows_only():
+    """Core rows without building dicts, as a lower bound"""
+    return db.session.execute(select_users()).all()
+
+
+def seed(count, batch_size=10000):
+    """Insert count users in batches"""
+    for start in range(0, count, batch_size):
+        rows = [
+            {
+                "name": f"User {i}",
+                "email": f"user{i}@example.com",
+                "age": 18 + i % 60,
+                "role": "admin" if i % 10 == 0 else "user"
+            }
+            for i in range(start, min(start + batch_size, count))
+        ]
+        db.session.execute(db.insert(User), rows)
+        db.session.commit()
+
+
+def bench(fn, repeat):
+    """Return the best wall time in seconds and the row count"""
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(fn())
+        best = min(best, time.perf_counter() - start)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = Flask(__name__)
+        app.config.from_object(Config)
+        app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(tmpdir, "bench.db")
+        init_db(app)
+        
+        with app.app_context():
+            UserStore.reset()
+            seed(args.rows)
+            
+            print(f"Reading {args.rows} users (best of {args.repeat})")
+            print(f"  {'path':<22} {'best ms':>10} {'rows/s':>14} {'speedup':>8}")
+            baseline = None
+            for name, fn in [
+                ("orm + to_dict", orm_read_all),
+                ("core + row dict", core_read_all),
+                ("core rows only", core_rows_only),
+            ]:
+                seconds, rows = bench(fn, args.repeat)
+                baseline = baseline or seconds
+                print(
+                    f"  {name:<22} {seconds * 1000:>10.1f} {rows / seconds:>14,.0f} "
+                    f"{baseline / seconds:>7.1f}x"
+                )
+            
+            db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Micro-benchmark for the JSON backends in responses.py
+
+Encodes a GET /users style success envelope of fake users with every
+installed backend and reports encode time and throughput.
+
+Usage:
+    python benchmarks/bench_serializers.py [--sizes 1000 100000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import responses
+
+
+def make_payload(count):
+    """Build a success envelope holding count users"""
+    now = datetime.utcnow()
+    users = [
+        {
+            "id": i,
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "age": 18 + i % 60,
+            "role": "admin" if i % 10 == 0 else "user",
+            "created_at": now - timedelta(seconds=i),
+            "updated_at": now
+        }
+        for i in range(1, count + 1)
+    ]
+    return {
+        "status": "success",
+        "message": f"Retrieved {count} user(s) successfully",
+        "data": {"users": users, "count": count}
+    }
+
+
+def bench(dumps, payload, repeat):
+    """Return the best wall time in seconds and the encoded size"""
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = dumps(payload)
+        best = min(best, time.perf_counter() - start)
+        size = len(body)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    backends = [name for name, dumps in responses.JSON_BACKENDS.items() if dumps]
+    print(f"Backends available: {', '.join(backends)}")
+    
+    for count in args.sizes:
+        payload = make_payload(count)
+        print(f"\n{count} users")
+        print(f"  {'backend':<8} {'best ms':>10} {'MB/s':>10} {'users/s':>14} {'speedup':>8}")
+        baseline = None
+        for name in reversed(backends):
+            seconds, size = bench(responses.JSON_BACKENDS[name], payload, args.repeat)
+            baseline = baseline or seconds
+            print(
+                f"  {name:<8} {seconds * 1000:>10.2f} {size / seconds / 1e6:>10.1f} "
+                f"{count / seconds:>14,.0f} {baseline / seconds:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
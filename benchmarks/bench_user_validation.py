@@ -0,0 +1,131 @@
+"""
+Micro-benchmark for user payload validation
+
+Compares the previous field-by-field validate_user_data (kept below for
+reference) with the current single-pass one that collects every error,
+both one record at a time and through validate_user_records() as the bulk
+endpoint uses it, and reports records per second for a mix of valid and
+invalid payloads.
+
+Usage:
+    python benchmarks/bench_user_validation.py [--records 20000] [--repeat 10]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from validators import (
+    ValidationError, normalize_email, validate_user_data, validate_user_records, email_cache
+)
+
+
+def legacy_validate_user_data(data, is_update=False):
+    """Previous implementation: field-by-field checks raising on the first error"""
+    validated = {}
+    if not is_update:
+        for field in ["name", "email", "age"]:
+            if field not in data or data[field] is None or str(data[field]).strip() == "":
+                raise ValidationError(f"Missing required field: {field}", error_code="MISSING_FIELD")
+    if "name" in data:
+        name = str(data["name"]).strip()
+        if len(name) < 3:
+            raise ValidationError("Name must be at least 3 characters long", error_code="INVALID_NAME")
+        if len(name) > 100:
+            raise ValidationError("Name must be less than 100 characters", error_code="INVALID_NAME")
+        validated["name"] = name
+    if "email" in data:
+        validated["email"] = normalize_email(str(data["email"]).strip())
+    if "age" in data:
+        try:
+            age = int(data["age"])
+            if age < 18:
+                raise ValidationError("Age must be 18 or older", error_code="INVALID_AGE")
+            if age > 150:
+                raise ValidationError("Age must be less than 150", error_code="INVALID_AGE")
+            validated["age"] = age
+        except (ValueError, TypeError):
+            raise ValidationError("Age must be a valid integer", error_code="INVALID_AGE")
+    if "role" in data:
+        role = str(data["role"]).strip().lower()
+        if role not in ["admin", "user"]:
+            raise ValidationError("Role must be either 'admin' or 'user'", error_code="INVALID_ROLE")
+        validated["role"] = role
+    return validated
+
+
+def make_records(count, invalid_ratio, seed=1):
+    """User payloads with about invalid_ratio of them failing validation"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        record = {"name": f"User {i}", "email": f"user{i}@example.com", "age": 18 + i % 60}
+        if i % 10 == 0:
+            record["role"] = "admin"
+        if rng.random() < invalid_ratio:
+            record[rng.choice(["name", "email", "age"])] = rng.choice(["", "x", "not-an-email", 5])
+        records.append(record)
+    return records
+
+
+def one_at_a_time(validate):
+    def run(records):
+        for record in records:
+            try:
+                validate(record)
+            except ValidationError:
+                pass
+    return run
+
+
+def bench(variants, records, repeat):
+    """
+    Return the best records per second of each variant over repeat rounds
+    
+    Variants take turns within each round so that drift in machine speed
+    affects them all alike; GC is paused while timing, as in timeit.
+    """
+    best = [float("inf")] * len(variants)
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for i, fn in enumerate(variants):
+                start = time.perf_counter()
+                fn(records)
+                best[i] = min(best[i], time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return [len(records) / elapsed for elapsed in best]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--invalid-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+    
+    records = make_records(args.records, args.invalid_ratio)
+    
+    # Warm the email memo so every variant measures the field checks alone
+    email_cache.configure(max_size=len(records) * 2)
+    one_at_a_time(legacy_validate_user_data)(records)
+    
+    variants = [
+        ("field by field (before)", one_at_a_time(legacy_validate_user_data)),
+        ("single pass, per record", one_at_a_time(validate_user_data)),
+        ("single pass, batch", validate_user_records),
+    ]
+    rates = bench([fn for _, fn in variants], records, args.repeat)
+    for (label, _), rate in zip(variants, rates):
+        print(f"{label:<25} {rate:>12,.0f} records/s  ({rate / rates[0]:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Cold-start budget check
+
+Imports the application in fresh interpreters against a temporary
+database and fails (exit code 1) when the median start-up time exceeds
+the budget, so regressions in import or init_db cost are caught early.
+
+Usage:
+    python benchmarks/check_startup.py [--module app] [--runs 5] [--budget 2.0]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(module, env):
+    """Return the wall time of importing module in a new interpreter"""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        check=True
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=float(os.environ.get("STARTUP_BUDGET_SECONDS", 2.0)),
+        help="Maximum median start-up time in seconds"
+    )
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        env = dict(os.environ, DATABASE_PATH=os.path.join(tmpdir, "startup.db"))
+        
+        # The first import may create and seed the database (DB_LAZY_INIT=0);
+        # time the rest
+        first = time_import(args.module, env)
+        times = [time_import(args.module, env) for _ in range(args.runs)]
+    
+    median = statistics.median(times)
+    print(f"import {args.module}: first run {first:.3f}s, "
+          f"median {median:.3f}s over {args.runs} runs (budget {args.budget:.3f}s)")
+    
+    if median > args.budget:
+        print("FAIL: cold start exceeds budget")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
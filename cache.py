@@ -0,0 +1,102 @@
+"""
+In-process caching utilities
+"""
+from collections import OrderedDict
+from threading import Lock
+import time
+
+
+class LRUCache:
+    """Bounded, thread-safe LRU cache with per-entry TTL and hit counters"""
+    
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def configure(self, max_size=None, ttl=None):
+        """Change size or TTL limits, dropping any current entries"""
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max_size
+            if ttl is not None:
+                self.ttl = ttl
+            self._data.clear()
+            self._generation += 1
+    
+    @property
+    def generation(self):
+        """
+        Counter bumped on every invalidation
+        
+        Read it before loading a value from the database and pass it to
+        set(), so a value loaded before a concurrent write is never stored.
+        """
+        return self._generation
+    
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key, value, generation=None, ttl=None):
+        """
+        Store value under key, evicting the least recently used entry
+        
+        A ttl shorter than the cache-wide one can be given per entry; it is
+        never extended beyond the cache's own TTL.
+        """
+        if self.max_size <= 0:
+            return
+        
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, key):
+        """Drop a single entry"""
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation += 1
+    
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+    
+    def stats(self):
+        """Return size and hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
@@ -9,4 +9,80 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+    # POST /refresh copies the role claim without a database lookup, so a
+    # role change or deletion only reaches a user's tokens after this long
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.environ.get('JWT_REFRESH_TOKEN_DAYS', 7)))
+    
+    # Revoked token IDs (POST /logout), optionally appended to a file that
+    # every worker reads new entries from each sync interval
+    JWT_REVOCATION_ENABLED = os.environ.get('JWT_REVOCATION_ENABLED', '0') == '1'
+    JWT_REVOCATION_FILE = os.environ.get('JWT_REVOCATION_FILE')
+    JWT_REVOCATION_SYNC_SECONDS = float(os.environ.get('JWT_REVOCATION_SYNC_SECONDS', 30))
+    
+    # Token signing: HS256 (JWT_SECRET_KEY), or RS256/EdDSA with a key pair.
+    # Signing nodes set JWT_PRIVATE_KEY_FILE; verification-only replicas set
+    # JWT_PUBLIC_KEYS_DIR (<kid>.pem per key). See keys.py
+    JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
+    JWT_PRIVATE_KEY_FILE = os.environ.get('JWT_PRIVATE_KEY_FILE')
+    JWT_PUBLIC_KEYS_DIR = os.environ.get('JWT_PUBLIC_KEYS_DIR')
+    JWT_KEY_ID = os.environ.get('JWT_KEY_ID')
+    JWKS_MAX_AGE_SECONDS = int(os.environ.get('JWKS_MAX_AGE_SECONDS', 300))
     JSON_SORT_KEYS = False
+    
+    # Create tables and seed data on the first request instead of at import
+    DB_LAZY_INIT = os.environ.get('DB_LAZY_INIT', '1') == '1'
+    
+    # Per-route latency and query metrics, served on GET /metrics
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    
+    # Directory shared by worker processes so /metrics reports all of them
+    # (gunicorn.conf.py sets one for multi-worker runs), and how often each
+    # process writes its totals there
+    METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR') or None
+    METRICS_SYNC_SECONDS = float(os.environ.get('METRICS_SYNC_SECONDS', 5))
+    
+    # Response encoder: "auto" picks orjson, then ujson, then the stdlib
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+    
+    # SQLite pragmas applied to every new database connection
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64000))  # negative = KiB
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    
+    # Connection pool sizing for the SQLAlchemy engine
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+    }
+    
+    # Pagination settings for GET /users
+    USERS_PAGE_DEFAULT_LIMIT = int(os.environ.get('USERS_PAGE_DEFAULT_LIMIT', 100))
+    USERS_PAGE_MAX_LIMIT = int(os.environ.get('USERS_PAGE_MAX_LIMIT', 1000))
+    
+    # Rows fetched from the database per batch by GET /users/export
+    USERS_EXPORT_BATCH_SIZE = int(os.environ.get('USERS_EXPORT_BATCH_SIZE', 1000))
+    
+    # Read-through cache for GET /users/<id> (set max size to 0 to disable);
+    # with several workers, the TTL bounds how long one worker can serve a
+    # user another worker has since changed
+    USER_CACHE_MAX_SIZE = int(os.environ.get('USER_CACHE_MAX_SIZE', 10000))
+    USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', 10))
+    
+    # Login lookup cache (raw email -> normalized email -> user ID/role);
+    # with several workers, the TTL bounds how long a role changed by
+    # another worker can still be put into new tokens
+    LOGIN_CACHE_MAX_SIZE = int(os.environ.get('LOGIN_CACHE_MAX_SIZE', 10000))
+    LOGIN_CACHE_TTL_SECONDS = float(os.environ.get('LOGIN_CACHE_TTL_SECONDS', 30))
+    
+    # Memoized email normalization results (validators.email_cache)
+    EMAIL_CACHE_MAX_SIZE = int(os.environ.get('EMAIL_CACHE_MAX_SIZE', 10000))
+    
+    # Verified bearer tokens (entries never outlive the token's exp claim)
+    TOKEN_CACHE_MAX_SIZE = int(os.environ.get('TOKEN_CACHE_MAX_SIZE', 10000))
+    TOKEN_CACHE_TTL_SECONDS = float(os.environ.get('TOKEN_CACHE_TTL_SECONDS', 300))
+    
+    # Largest number of users accepted by one POST /users/bulk request
+    USERS_BULK_MAX_ITEMS = int(os.environ.get('USERS_BULK_MAX_ITEMS', 10000))
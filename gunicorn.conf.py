@@ -0,0 +1,117 @@
+"""
+Production gunicorn configuration for API Backend
+
+gunicorn loads this file automatically from the working directory:
+    gunicorn app:app
+
+Every setting can be overridden from the environment (GUNICORN_*).
+"""
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+# Server socket
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+backlog = int(os.environ.get('GUNICORN_BACKLOG', 2048))
+
+# Workers: "gthread" (default) or "gevent" (requires the gevent package)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Import the app (and create the schema, see when_ready) once in the master;
+# workers are forked with the code already loaded
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+# Timeouts and worker recycling
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# With several workers each keeps its own metrics; a directory they all
+# write to lets GET /metrics on any worker report the combined totals
+if workers > 1:
+    os.environ.setdefault(
+        'METRICS_MULTIPROC_DIR',
+        os.path.join(tempfile.gettempdir(), f'api-backend-metrics-{os.getpid()}')
+    )
+
+# Logging
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    """Start the metrics totals from zero, not from a previous run's files"""
+    directory = os.environ.get('METRICS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def on_exit(server):
+    """Remove the per-run metrics directory created above"""
+    directory = os.environ.get('METRICS_MULTIPROC_DIR')
+    if directory and os.path.basename(directory) == f'api-backend-metrics-{os.getpid()}':
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def when_ready(server):
+    """
+    Create tables and seed data in the master before any worker is forked
+    
+    With DB_LAZY_INIT the app defers this to its first request; doing it
+    here spares every worker that first-request setup. Skipped when the
+    preloaded entry point is the lazy one (wsgi:app), which has not
+    imported the app and should not be made to; its workers then take
+    turns through init_schema under the database write lock.
+    """
+    app_module = sys.modules.get('app')
+    if not server.cfg.preload_app or app_module is None:
+        return
+    
+    app_module.ensure_schema()
+    server.log.info("Database schema ready")
+
+
+def post_fork(server, worker):
+    """
+    Drop database connections inherited from the master
+    
+    SQLite connections must never be shared across processes, so each
+    worker starts with an empty pool; close=False leaves the master's
+    connections alone instead of closing them from the child. If the app
+    was not imported before the fork (no preload, or wsgi:app) there is
+    nothing to drop, and importing it here would undo the lazy start.
+    """
+    app_module = sys.modules.get('app')
+    if app_module is None:
+        return
+    
+    from models_sqlite import db
+    
+    with app_module.app.app_context():
+        db.engine.dispose(close=False)
+    
+    server.log.info(f"Worker {worker.pid}: database pool reset after fork")
+
+
+def worker_exit(server, worker):
+    """
+    Write the exiting worker's final metrics so its counts are kept, and
+    release its handle on the revocation file (revocations themselves are
+    already on disk: revoke() appends each one before returning)
+    """
+    app_module = sys.modules.get('app')
+    if app_module is not None and app_module.request_metrics.multiprocess_dir:
+        app_module.request_metrics.write_snapshot()
+    
+    auth_module = sys.modules.get('auth')
+    if auth_module is not None and auth_module.revoked_tokens is not None:
+        auth_module.revoked_tokens.close()
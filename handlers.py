@@ -0,0 +1,334 @@
+"""
+Request handling shared by the WSGI (app.py) and ASGI (asgi.py) apps
+
+Each route does its own I/O in its own mode: reading the body, calling the
+sync or async user store, and wrapping the result in a Flask or Quart
+response. Everything in between lives here so the two modes cannot drift
+apart: parsing and validating input, building response data, ETags and
+CORS headers.
+"""
+import hashlib
+import json
+
+from responses import prerender_error
+from validators import (
+    ValidationError, validate_user_id, validate_user_records, field_errors, encode_cursor
+)
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+ROLES = ("admin", "user")
+
+# Fixed error bodies returned by the routes of both apps
+LOGIN_USER_NOT_FOUND_ERROR = prerender_error(
+    "User not found with provided email", "USER_NOT_FOUND", 404
+)
+INVALID_FORMAT_ERROR = prerender_error(
+    "Invalid export format. Must be 'ndjson' or 'json'", "INVALID_FORMAT", 400
+)
+REVOCATION_DISABLED_ERROR = prerender_error(
+    "Token revocation is not enabled on this server", "REVOCATION_DISABLED", 501
+)
+
+
+# ============================================================================
+# AUTHENTICATION
+# ============================================================================
+
+def token_claims(user):
+    """Additional JWT claims for a user dict or the claims of another token"""
+    return {
+        "role": user.get("role", "user"),
+        "email": user.get("email")
+    }
+
+
+def login_data(user, access_token, refresh_token):
+    """Response data for a successful login"""
+    return {
+        "token": access_token,
+        "refresh_token": refresh_token,
+        "user": {
+            "id": user["id"],
+            "name": user["name"],
+            "email": user["email"],
+            "role": user["role"]
+        }
+    }
+
+
+def revocation_data(claims):
+    """Response data for a revoked token"""
+    return {"jti": claims["jti"], "type": claims.get("type")}
+
+
+def jwks_body(keyset):
+    """Encoded GET /.well-known/jwks.json body listing the keyset's public keys"""
+    return json.dumps(keyset.jwks()).encode()
+
+
+# ============================================================================
+# USERS
+# ============================================================================
+
+def user_not_found(user_id):
+    """error_response() arguments for a missing user"""
+    return {
+        "message": f"User with ID {user_id} not found",
+        "error_code": "USER_NOT_FOUND",
+        "status_code": 404
+    }
+
+
+def parse_role_filter(role_filter):
+    """
+    Validate the optional role query parameter
+    
+    Returns:
+        Lowercased role, or None if no filter was given
+    
+    Raises:
+        ValidationError: If the role is not a known one
+    """
+    if not role_filter:
+        return None
+    role_filter = role_filter.lower()
+    if role_filter not in ROLES:
+        raise ValidationError(
+            "Invalid role filter. Must be 'admin' or 'user'",
+            error_code="INVALID_FILTER"
+        )
+    return role_filter
+
+
+def users_collection_etag(version, query_string):
+    """ETag of one page of GET /users: the table version plus the page asked for"""
+    query_digest = hashlib.sha1(query_string).hexdigest()[:16]
+    return f"users-{version}-{query_digest}"
+
+
+def users_page_data(users, last_id):
+    """Response data and message for one page of users"""
+    return {
+        "users": users,
+        "count": len(users),
+        "next_cursor": encode_cursor(last_id) if last_id is not None else None
+    }, f"Retrieved {len(users)} user(s) successfully"
+
+
+# ============================================================================
+# BULK OPERATIONS
+# ============================================================================
+
+def parse_bulk_items(body, ndjson, max_items):
+    """
+    Read the items of a bulk create request body
+    
+    Accepts a JSON array, a JSON object with a "users" array, or an NDJSON
+    body (Content-Type: application/x-ndjson) with one user per line.
+    
+    Args:
+        body: Request text for NDJSON, otherwise the parsed JSON (or None)
+        ndjson: Whether the body is NDJSON
+        max_items: Largest number of items a request may contain
+    
+    Returns:
+        List of items; lines that are not valid JSON are returned as
+        ValidationError instances so they can be reported per item
+    
+    Raises:
+        ValidationError: If the body is missing or has the wrong shape
+    """
+    if ndjson:
+        items = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(ValidationError(
+                    "Line is not valid JSON",
+                    error_code="INVALID_JSON"
+                ))
+    else:
+        items = body.get('users') if isinstance(body, dict) else body
+    
+    if not isinstance(items, list) or not items:
+        raise ValidationError(
+            "Request body must be a non-empty array of users",
+            error_code="MISSING_BODY"
+        )
+    
+    if len(items) > max_items:
+        raise ValidationError(
+            f"A bulk request may contain at most {max_items} users",
+            error_code="TOO_MANY_ITEMS"
+        )
+    
+    return items
+
+
+def _item_error(index, error_code, message, errors=None):
+    result = {
+        "index": index,
+        "status": "error",
+        "error_code": error_code,
+        "message": message
+    }
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+def check_bulk_items(items):
+    """
+    Validate every bulk item up front; invalid ones are reported, not fatal
+    
+    Returns:
+        Tuple of (results list with an error entry for each invalid item
+        and None elsewhere, positions of the valid items, their validated
+        user dicts)
+    """
+    results = [None] * len(items)
+    candidates = []
+    for index, item in enumerate(items):
+        if isinstance(item, ValidationError):
+            results[index] = _item_error(index, item.error_code, item.message)
+        elif not isinstance(item, dict) or not item:
+            results[index] = _item_error(index, "MISSING_BODY", "Each user must be a non-empty JSON object")
+        else:
+            candidates.append(index)
+    
+    # One pass of the user schema over all remaining items, reporting every
+    # field error of each invalid one
+    valid_positions = []
+    valid_users = []
+    checked = validate_user_records(items[index] for index in candidates)
+    for index, (validated, errors) in zip(candidates, checked):
+        if errors:
+            results[index] = _item_error(
+                index, errors[0].error_code, errors[0].message, field_errors(errors)
+            )
+        else:
+            valid_positions.append(index)
+            valid_users.append(validated)
+    
+    return results, valid_positions, valid_users
+
+
+def bulk_create_result(results, valid_positions, created_users):
+    """
+    Fill in the outcome of the insert for each valid item
+    
+    Returns:
+        Tuple of (response data, message, status code: 201 if every user
+        was created, 207 otherwise)
+    """
+    for index, user in zip(valid_positions, created_users):
+        if user is None:
+            results[index] = _item_error(
+                index, "DUPLICATE_EMAIL", "Email already exists. Please use a different email."
+            )
+        else:
+            results[index] = {"index": index, "status": "created", "user": user}
+    
+    created = sum(1 for r in results if r["status"] == "created")
+    failed = len(results) - created
+    
+    return (
+        {"results": results, "created": created, "failed": failed},
+        f"Created {created} of {len(results)} user(s)",
+        201 if failed == 0 else 207
+    )
+
+
+def parse_delete_ids(body, max_items):
+    """
+    Read and validate the IDs of a bulk delete request body
+    
+    Returns:
+        List of integer user IDs
+    
+    Raises:
+        ValidationError: If the body is missing, too large or holds an ID
+            that is not a positive JSON integer
+    """
+    ids = body.get('ids') if isinstance(body, dict) else None
+    
+    if not isinstance(ids, list) or not ids:
+        raise ValidationError(
+            "Request body must contain a non-empty 'ids' array",
+            error_code="MISSING_BODY"
+        )
+    
+    if len(ids) > max_items:
+        raise ValidationError(
+            f"A bulk request may contain at most {max_items} IDs",
+            error_code="TOO_MANY_ITEMS"
+        )
+    
+    # Only JSON integers: int() would turn true into 1 and 2.9 into 2, and
+    # this endpoint deletes whatever IDs it ends up with
+    for user_id in ids:
+        if isinstance(user_id, bool) or not isinstance(user_id, int):
+            raise ValidationError(
+                "User IDs must be integers",
+                error_code="INVALID_USER_ID"
+            )
+    
+    return [validate_user_id(user_id) for user_id in ids]
+
+
+def bulk_delete_data(validated_ids, deleted_users):
+    """Response data and message for a bulk delete"""
+    deleted_ids = {user['id'] for user in deleted_users}
+    not_found = sorted(set(validated_ids) - deleted_ids)
+    return {
+        "deleted": deleted_users,
+        "not_found": not_found,
+        "count": len(deleted_users)
+    }, f"Deleted {len(deleted_users)} user(s) successfully"
+
+
+# ============================================================================
+# CORS
+# ============================================================================
+
+# flask_cors defaults, as app.py runs with CORS(app)
+CORS_METHODS = "DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+
+
+def cors_headers(method, request_headers):
+    """
+    CORS response headers for a request, as flask_cors sets them by default
+    
+    Any origin is allowed: a request with an Origin header gets it echoed
+    back (with Vary: Origin), one without gets "*". A preflight (OPTIONS
+    with Access-Control-Request-Method) also gets the allowed methods and
+    every header it asked for, e.g. Authorization for bearer tokens.
+    
+    Args:
+        method: Request method
+        request_headers: Mapping of request headers
+    
+    Returns:
+        Dict of headers to add to the response
+    """
+    origin = request_headers.get("Origin")
+    headers = {"Access-Control-Allow-Origin": origin or "*"}
+    
+    if request_headers.get("Access-Control-Request-Private-Network") == "true":
+        headers["Access-Control-Allow-Private-Network"] = "true"
+    
+    if method == "OPTIONS":
+        requested_method = request_headers.get("Access-Control-Request-Method", "").upper()
+        if requested_method and requested_method in CORS_METHODS.split(", "):
+            requested_headers = request_headers.get("Access-Control-Request-Headers")
+            if requested_headers:
+                headers["Access-Control-Allow-Headers"] = requested_headers
+            headers["Access-Control-Allow-Methods"] = CORS_METHODS
+    
+    if origin:
+        headers["Vary"] = "Origin"
+    return headers
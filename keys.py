@@ -0,0 +1,157 @@
+"""
+JWT signing and verification keys
+
+With the default HS256 every node signs and verifies with JWT_SECRET_KEY.
+With RS256 or EdDSA, tokens carry a "kid" header naming the public key
+that verifies them. Nodes that issue tokens hold the private key
+(JWT_PRIVATE_KEY_FILE). Verification-only replicas need only the public
+keys (JWT_PUBLIC_KEYS_DIR, one <kid>.pem per key), and a retired key can
+stay in that directory until the last token it signed has expired.
+
+Keys are parsed once at start-up and handed to PyJWT as key objects, so
+verifying a token never re-parses PEM.
+"""
+import base64
+import hashlib
+import json
+import os
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "RS384", "RS512", "EdDSA")
+
+
+class UnknownKeyError(Exception):
+    """Raised when a token names a key ID that is not in the keyset"""
+    pass
+
+
+def _load_private_key(path):
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+    
+    with open(path, "rb") as f:
+        return load_pem_private_key(f.read(), password=None)
+
+
+def _load_public_key(path):
+    from cryptography.hazmat.primitives.serialization import load_pem_public_key
+    
+    with open(path, "rb") as f:
+        return load_pem_public_key(f.read())
+
+
+def public_jwk(public_key, algorithm):
+    """Return the public JWK (as a dict) for a cryptography public key"""
+    from jwt.algorithms import RSAAlgorithm, OKPAlgorithm
+    
+    if algorithm == "EdDSA":
+        return OKPAlgorithm.to_jwk(public_key, as_dict=True)
+    return RSAAlgorithm.to_jwk(public_key, as_dict=True)
+
+
+def jwk_thumbprint(jwk):
+    """RFC 7638 thumbprint of a public JWK, used as the default key ID"""
+    required = {"RSA": ("e", "kty", "n"), "OKP": ("crv", "kty", "x")}[jwk["kty"]]
+    canonical = json.dumps({name: jwk[name] for name in required}, separators=(",", ":"), sort_keys=True)
+    digest = hashlib.sha256(canonical.encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+class KeySet:
+    """
+    Signing key and kid-indexed verification keys for one algorithm
+    
+    Attributes:
+        algorithm: JWT "alg" used to sign and accepted when verifying
+        signing_kid: Key ID put in the header of tokens this node signs,
+            or None for HS256
+    """
+    
+    def __init__(self, algorithm="HS256", secret=None, private_key_file=None,
+                 public_keys_dir=None, signing_kid=None):
+        self.algorithm = algorithm
+        self.signing_kid = None
+        self._secret = secret
+        self._signing_key = None
+        self._public_keys = {}
+        self._jwks = {"keys": []}
+        
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            return
+        
+        if public_keys_dir:
+            for name in sorted(os.listdir(public_keys_dir)):
+                kid, extension = os.path.splitext(name)
+                if extension == ".pem":
+                    self._public_keys[kid] = _load_public_key(os.path.join(public_keys_dir, name))
+        
+        if private_key_file:
+            self._signing_key = _load_private_key(private_key_file)
+            public_key = self._signing_key.public_key()
+            self.signing_kid = signing_kid or jwk_thumbprint(public_jwk(public_key, algorithm))
+            self._public_keys.setdefault(self.signing_kid, public_key)
+        
+        if not self._public_keys:
+            raise ValueError(f"{algorithm} needs JWT_PRIVATE_KEY_FILE or JWT_PUBLIC_KEYS_DIR")
+        
+        self._jwks = {
+            "keys": [
+                dict(public_jwk(key, algorithm), kid=kid, alg=algorithm, use="sig")
+                for kid, key in self._public_keys.items()
+            ]
+        }
+    
+    @classmethod
+    def from_config(cls, config):
+        """Build the keyset from a Config class or Flask config mapping"""
+        if hasattr(config, "get"):
+            get = config.get
+        else:
+            get = lambda name, default=None: getattr(config, name, default)
+        return cls(
+            algorithm=get("JWT_ALGORITHM", "HS256"),
+            secret=get("JWT_SECRET_KEY"),
+            private_key_file=get("JWT_PRIVATE_KEY_FILE"),
+            public_keys_dir=get("JWT_PUBLIC_KEYS_DIR"),
+            signing_kid=get("JWT_KEY_ID")
+        )
+    
+    @property
+    def asymmetric(self):
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+    
+    def signing_key(self):
+        """
+        Key to sign new tokens with
+        
+        Raises:
+            RuntimeError: On a verification-only node
+        """
+        if not self.asymmetric:
+            return self._secret
+        if self._signing_key is None:
+            raise RuntimeError("No JWT_PRIVATE_KEY_FILE configured; this node cannot issue tokens")
+        return self._signing_key
+    
+    def signing_headers(self):
+        """Extra JWT headers for tokens this node signs"""
+        return {"kid": self.signing_kid} if self.signing_kid else {}
+    
+    def verification_key(self, kid=None):
+        """
+        Parsed key that verifies a token with the given "kid" header
+        
+        Tokens without a kid are checked against this node's signing key.
+        
+        Raises:
+            UnknownKeyError: If kid is not in the keyset
+        """
+        if not self.asymmetric:
+            return self._secret
+        
+        key = self._public_keys.get(kid or self.signing_kid)
+        if key is None:
+            raise UnknownKeyError(f"Unknown signing key: {kid}")
+        return key
+    
+    def jwks(self):
+        """Public keys as a JWKS document (empty for HS256)"""
+        return self._jwks
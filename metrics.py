@@ -0,0 +1,313 @@
+"""
+Request and database metrics in Prometheus text format
+
+Every thread records into its own shard of plain dicts and lists, so the
+request path never takes a lock; only a scrape walks the shards and adds
+them up. Shards of finished threads are folded into a retired total so
+thread-per-request servers do not accumulate them.
+
+With several worker processes, give the registry a directory shared by
+all of them (METRICS_MULTIPROC_DIR). Each process then writes its running
+totals there every few seconds, and a scrape of any worker adds up every
+process's file. Files of exited workers are kept, so counters never go
+down when workers are recycled.
+"""
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock, current_thread, local
+import json
+import logging
+import os
+import time
+
+from periodic import PeriodicSync
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the queries-per-request histogram buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+logger = logging.getLogger(__name__)
+
+
+class _Shard:
+    """Counters written by a single thread"""
+    
+    def __init__(self, thread):
+        self.thread = thread
+        self.requests = {}          # (method, route, status) -> count
+        self.latency = {}           # (method, route) -> [bucket counts..., sum]
+        self.db_queries = {}        # (method, route) -> [bucket counts..., sum]
+        self.db_seconds = {}        # (method, route) -> total seconds
+    
+    def merge_into(self, totals):
+        """Add this shard's values to another shard"""
+        for key, count in list(self.requests.items()):
+            totals.requests[key] = totals.requests.get(key, 0) + count
+        for name in ("latency", "db_queries"):
+            target = getattr(totals, name)
+            for key, values in list(getattr(self, name).items()):
+                current = target.setdefault(key, [0] * len(values))
+                for i, value in enumerate(values):
+                    current[i] += value
+        for key, seconds in list(self.db_seconds.items()):
+            totals.db_seconds[key] = totals.db_seconds.get(key, 0.0) + seconds
+    
+    def to_json(self):
+        """Serialize the counters (tuple keys become list prefixes)"""
+        return json.dumps({
+            name: [list(key) + [value] for key, value in getattr(self, name).items()]
+            for name in ("requests", "latency", "db_queries", "db_seconds")
+        })
+    
+    @classmethod
+    def from_json(cls, text):
+        """Rebuild a shard written by to_json"""
+        shard = cls(None)
+        for name, entries in json.loads(text).items():
+            getattr(shard, name).update((tuple(entry[:-1]), entry[-1]) for entry in entries)
+        return shard
+
+
+def _observe(histograms, key, buckets, value):
+    """Add value to the histogram stored under key"""
+    counts = histograms.get(key)
+    if counts is None:
+        counts = histograms[key] = [0] * (len(buckets) + 2)
+    counts[bisect_left(buckets, value)] += 1
+    counts[-1] += value
+
+
+class MetricsRegistry:
+    """
+    Per-route request counters, latency histograms and query statistics
+    
+    Args:
+        multiprocess_dir: Directory shared by all worker processes, or None
+            to report this process alone
+        sync_interval: Seconds between writes of this process's totals to
+            multiprocess_dir
+    """
+    
+    def __init__(self, multiprocess_dir=None, sync_interval=5):
+        self._local = local()
+        self._shards = []
+        self._retired = _Shard(None)
+        self._lock = Lock()
+        # Serializes snapshot writes from the sync thread and scrapes
+        self._write_lock = Lock()
+        self.multiprocess_dir = multiprocess_dir
+        self.sync_interval = sync_interval
+        self._syncer = PeriodicSync(self.write_snapshot, sync_interval, "Metrics snapshot write", logger)
+        # Per-request timing lives in a context variable rather than the
+        # thread, so concurrent requests on one event loop stay apart
+        self._request = ContextVar(f"metrics_request_{id(self)}", default=None)
+    
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(current_thread())
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+    
+    def start_request(self):
+        """Start timing the current request and reset its query stats"""
+        # [start time, queries, seconds in queries]
+        self._request.set([time.perf_counter(), 0, 0.0])
+    
+    def record_query(self, seconds):
+        """Count one query against the current request, if any"""
+        state = self._request.get()
+        if state is not None:
+            state[1] += 1
+            state[2] += seconds
+    
+    def finish_request(self, method, route, status):
+        """Record the current request once its response is ready"""
+        state = self._request.get()
+        if state is None:
+            return
+        self._request.set(None)
+        started, queries, query_seconds = state
+        
+        shard = self._shard()
+        key = (method, route)
+        shard.requests[(method, route, status)] = shard.requests.get((method, route, status), 0) + 1
+        _observe(shard.latency, key, LATENCY_BUCKETS, time.perf_counter() - started)
+        _observe(shard.db_queries, key, QUERY_COUNT_BUCKETS, queries)
+        shard.db_seconds[key] = shard.db_seconds.get(key, 0.0) + query_seconds
+        
+        if self.multiprocess_dir:
+            self._syncer.ensure_started()
+    
+    def snapshot(self):
+        """Add up every shard, folding those of finished threads into the retired total"""
+        totals = _Shard(None)
+        with self._lock:
+            live = []
+            for shard in self._shards:
+                if shard.thread.is_alive():
+                    live.append(shard)
+                else:
+                    shard.merge_into(self._retired)
+            self._shards = live
+            self._retired.merge_into(totals)
+        for shard in live:
+            shard.merge_into(totals)
+        return totals
+    
+    def _snapshot_path(self, pid):
+        return os.path.join(self.multiprocess_dir, f"metrics-{pid}.json")
+    
+    def write_snapshot(self):
+        """
+        Write this process's totals to the shared directory
+        
+        The totals are taken and written under one lock, so concurrent
+        writers (the sync thread and scrapes) never share the temporary
+        file and a newer snapshot is never replaced by an older one.
+        
+        Returns:
+            The totals that were written
+        """
+        with self._write_lock:
+            totals = self.snapshot()
+            os.makedirs(self.multiprocess_dir, exist_ok=True)
+            path = self._snapshot_path(os.getpid())
+            with open(f"{path}.tmp", "w") as f:
+                f.write(totals.to_json())
+            os.replace(f"{path}.tmp", path)
+        return totals
+    
+    def collect(self):
+        """
+        Totals to report: this process's, plus every other process's last
+        written snapshot when a shared directory is configured
+        """
+        if not self.multiprocess_dir:
+            return self.snapshot()
+        
+        totals = self.write_snapshot()
+        combined = _Shard(None)
+        totals.merge_into(combined)
+        own = os.path.basename(self._snapshot_path(os.getpid()))
+        for name in os.listdir(self.multiprocess_dir):
+            if name == own or not (name.startswith("metrics-") and name.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, name)) as f:
+                    _Shard.from_json(f.read()).merge_into(combined)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping metrics file {name}: {str(e)}")
+        return combined
+    
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        totals = self.collect()
+        lines = [
+            "# HELP http_requests_total Requests handled, by route and status code",
+            "# TYPE http_requests_total counter"
+        ]
+        for (method, route, status), count in sorted(totals.requests.items()):
+            lines.append(
+                f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}'
+            )
+        
+        lines.extend(_render_histogram(
+            "http_request_duration_seconds", "Request latency in seconds",
+            totals.latency, LATENCY_BUCKETS
+        ))
+        lines.extend(_render_histogram(
+            "http_request_db_queries", "Database queries issued per request",
+            totals.db_queries, QUERY_COUNT_BUCKETS
+        ))
+        
+        lines.append("# HELP http_request_db_seconds_total Time spent in database queries")
+        lines.append("# TYPE http_request_db_seconds_total counter")
+        for (method, route), seconds in sorted(totals.db_seconds.items()):
+            lines.append(
+                f'http_request_db_seconds_total{{method="{method}",route="{_escape(route)}"}} {seconds:.6f}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_histogram(name, help_text, histograms, buckets):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (method, route), counts in sorted(histograms.items()):
+        labels = f'method="{method}",route="{_escape(route)}"'
+        cumulative = 0
+        for bound, count in zip(buckets, counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += counts[len(buckets)]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {counts[-1]:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+    return lines
+
+
+def _record_queries(engine, registry):
+    """Time every query on a (sync) engine into the current request's stats"""
+    from sqlalchemy import event
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def record_query(conn, cursor, statement, parameters, context, executemany):
+        registry.record_query(time.perf_counter() - conn.info["query_started"].pop())
+    
+    @event.listens_for(engine, "handle_error")
+    def record_failed_query(exception_context):
+        conn = exception_context.connection
+        started = conn.info.get("query_started") if conn is not None else None
+        if started:
+            registry.record_query(time.perf_counter() - started.pop())
+
+
+def init_metrics(app, engine, registry):
+    """
+    Record every request of app and every query on engine into registry
+    
+    Requests are labelled with their URL rule (e.g. /users/<user_id>) rather
+    than the raw path so label cardinality stays bounded.
+    """
+    from flask import request
+    
+    @app.before_request
+    def start_request_timer():
+        registry.start_request()
+    
+    @app.after_request
+    def record_request(response):
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        registry.finish_request(request.method, route, response.status_code)
+        return response
+    
+    _record_queries(engine, registry)
+
+
+def init_metrics_async(app, engine, registry):
+    """init_metrics for the Quart app and its async engine (see asgi.py)"""
+    from quart import request
+    
+    @app.before_request
+    async def start_request_timer():
+        registry.start_request()
+    
+    @app.after_request
+    async def record_request(response):
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        registry.finish_request(request.method, route, response.status_code)
+        return response
+    
+    _record_queries(engine.sync_engine, registry)
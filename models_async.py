@@ -0,0 +1,327 @@
+"""
+Async SQLite user store for the ASGI deployment mode
+
+Mirrors UserStore in models_sqlite.py on top of SQLAlchemy's async engine
+and aiosqlite, reusing the same table definitions, triggers and row
+serialization so both modes read and write the same database.
+"""
+from datetime import datetime
+
+from sqlalchemy import event, select, insert, update, delete, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from models_sqlite import (
+    db, User, TableVersion, DuplicateEmailError, SAMPLE_USERS, USERS_VERSION_TRIGGERS,
+    user_row_to_dict, user_etag, user_columns, select_users, sqlite_pragmas
+)
+
+users_table = User.__table__
+
+
+class AsyncUserStore:
+    """User store operations using SQLAlchemy's async engine"""
+    
+    def __init__(self, database_url, config=None):
+        """
+        Args:
+            database_url: Async database URL, e.g. "sqlite+aiosqlite:///users.db"
+            config: Mapping with the SQLITE_* and SQLALCHEMY_ENGINE_OPTIONS settings
+        """
+        config = config or {}
+        self.engine = create_async_engine(
+            database_url,
+            **config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+        )
+        
+        if self.engine.dialect.name == 'sqlite':
+            pragmas = sqlite_pragmas(config)
+            
+            @event.listens_for(self.engine.sync_engine, "connect")
+            def set_sqlite_pragmas(dbapi_connection, connection_record):
+                cursor = dbapi_connection.cursor()
+                try:
+                    for pragma in pragmas:
+                        cursor.execute(pragma)
+                finally:
+                    cursor.close()
+    
+    async def init_db(self):
+        """
+        Create tables, indexes and triggers, and seed an empty database
+        
+        Runs under the SQLite write lock, like init_schema, so ASGI workers
+        starting together do not race each other through create_all.
+        """
+        async with self.engine.begin() as conn:
+            if conn.dialect.name == 'sqlite':
+                await conn.exec_driver_sql("BEGIN IMMEDIATE")
+            await conn.run_sync(db.metadata.create_all)
+            for index in users_table.indexes:
+                await conn.run_sync(index.create, checkfirst=True)
+            await conn.execute(text(
+                "INSERT OR IGNORE INTO table_versions (name, version) VALUES ('users', 0)"
+            ))
+            for trigger in USERS_VERSION_TRIGGERS:
+                await conn.execute(text(trigger))
+            
+            count = await conn.scalar(select(db.func.count()).select_from(users_table))
+            if count == 0:
+                await conn.execute(insert(users_table), [dict(user) for user in SAMPLE_USERS])
+    
+    async def close(self):
+        """Release pooled connections"""
+        await self.engine.dispose()
+    
+    async def create_user(self, user_data):
+        """
+        Create a new user with one INSERT ... ON CONFLICT DO NOTHING RETURNING
+        
+        Returns:
+            The created user dict, or None if the email already exists
+        """
+        statement = sqlite_insert(users_table).values(
+            name=user_data['name'],
+            email=user_data['email'],
+            age=user_data['age'],
+            role=user_data.get('role', 'user')
+        ).on_conflict_do_nothing(index_elements=['email']).returning(*users_table.columns)
+        
+        async with self.engine.begin() as conn:
+            row = (await conn.execute(statement)).first()
+        return user_row_to_dict(row) if row else None
+    
+    async def create_users_bulk(self, users_data):
+        """
+        Create many users in a single transaction
+        
+        Returns:
+            List aligned with users_data holding the created user dict, or
+            None where the email already exists
+        """
+        for attempt in range(2):
+            taken = await self.existing_emails(u['email'] for u in users_data)
+            
+            rows = []
+            positions = []
+            for position, user_data in enumerate(users_data):
+                if user_data['email'] in taken:
+                    continue
+                taken.add(user_data['email'])
+                positions.append(position)
+                rows.append({
+                    'name': user_data['name'],
+                    'email': user_data['email'],
+                    'age': user_data['age'],
+                    'role': user_data.get('role', 'user')
+                })
+            
+            results = [None] * len(users_data)
+            if not rows:
+                return results
+            
+            statement = insert(users_table).returning(
+                *users_table.columns, sort_by_parameter_order=True
+            )
+            try:
+                async with self.engine.begin() as conn:
+                    created = (await conn.execute(statement, rows)).all()
+            except IntegrityError:
+                if attempt:
+                    raise
+                continue
+            
+            for position, row in zip(positions, created):
+                results[position] = user_row_to_dict(row)
+            return results
+    
+    async def existing_emails(self, emails, chunk_size=500):
+        """Return the subset of emails that already belong to a user"""
+        emails = list(set(emails))
+        found = set()
+        async with self.engine.connect() as conn:
+            for start in range(0, len(emails), chunk_size):
+                chunk = emails[start:start + chunk_size]
+                found.update(await conn.scalars(
+                    select(users_table.c.email).where(users_table.c.email.in_(chunk))
+                ))
+        return found
+    
+    async def get_user_by_id(self, user_id):
+        """Get user by ID"""
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(select_users().where(User.id == user_id))).first()
+        return user_row_to_dict(row) if row else None
+    
+    async def get_user_fields(self, user_id, fields):
+        """
+        Get selected fields of a user with a column-restricted SELECT
+        
+        Returns:
+            Tuple of (dict of the requested fields, ETag for this fieldset),
+            or (None, None) if the user does not exist
+        """
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(
+                select(*user_columns(fields, 'updated_at')).where(User.id == user_id)
+            )).mappings().first()
+        if not row:
+            return None, None
+        return {name: row[name] for name in fields}, user_etag(user_id, row['updated_at'], fields)
+    
+    async def get_user_etag(self, user_id, fields=None):
+        """Get a user's ETag from its updated_at column alone, or None"""
+        async with self.engine.connect() as conn:
+            updated_at = await conn.scalar(
+                select(User.updated_at).where(User.id == user_id)
+            )
+        return user_etag(user_id, updated_at, fields) if updated_at else None
+    
+    async def get_users_version(self):
+        """Get the change counter for the users table"""
+        async with self.engine.connect() as conn:
+            version = await conn.scalar(
+                select(TableVersion.version).where(TableVersion.name == 'users')
+            )
+        return version or 0
+    
+    async def get_user_by_email(self, email):
+        """Get user by email"""
+        async with self.engine.connect() as conn:
+            row = (await conn.execute(select_users().where(User.email == email))).first()
+        return user_row_to_dict(row) if row else None
+    
+    async def get_users_page(self, limit, after_id=None, role=None, fields=None):
+        """
+        Get one page of users ordered by ID (keyset pagination)
+        
+        Returns:
+            Tuple of (list of user dicts, last ID on the page or None if
+            this is the final page)
+        """
+        query = select(*user_columns(fields, 'id')) if fields else select_users()
+        if role is not None:
+            query = query.where(User.role == role)
+        if after_id is not None:
+            query = query.where(User.id > after_id)
+        query = query.order_by(User.id).limit(limit + 1)
+        
+        async with self.engine.connect() as conn:
+            result = await conn.execute(query)
+            rows = result.mappings().all() if fields else result.all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        if fields:
+            next_after_id = rows[-1]['id'] if has_more else None
+            users = [{name: row[name] for name in fields} for row in rows]
+        else:
+            next_after_id = rows[-1].id if has_more else None
+            users = [user_row_to_dict(row) for row in rows]
+        return users, next_after_id
+    
+    async def iter_users(self, batch_size=1000, role=None):
+        """
+        Iterate over all users in ID order, streaming rows from the cursor
+        
+        Yields:
+            User dictionaries
+        """
+        query = select_users().order_by(User.id)
+        if role is not None:
+            query = query.where(User.role == role)
+        
+        async with self.engine.connect() as conn:
+            result = await conn.stream(query.execution_options(yield_per=batch_size))
+            async for row in result:
+                yield user_row_to_dict(row)
+    
+    async def update_user(self, user_id, user_data):
+        """
+        Update an existing user with one UPDATE ... RETURNING
+        
+        Returns:
+            The updated user dict, or None if the user does not exist
+        
+        Raises:
+            DuplicateEmailError: If the new email belongs to another user
+        """
+        values = {
+            field: user_data[field]
+            for field in ('name', 'email', 'age', 'role')
+            if field in user_data
+        }
+        values['updated_at'] = datetime.utcnow()
+        
+        statement = (
+            update(users_table)
+            .where(users_table.c.id == user_id)
+            .values(**values)
+            .returning(*users_table.columns)
+        )
+        
+        try:
+            async with self.engine.begin() as conn:
+                row = (await conn.execute(statement)).first()
+        except IntegrityError:
+            raise DuplicateEmailError(user_data.get('email'))
+        
+        return user_row_to_dict(row) if row else None
+    
+    async def delete_user(self, user_id):
+        """
+        Delete a user with one DELETE ... RETURNING
+        
+        Returns:
+            The deleted user dict, or None if the user does not exist
+        """
+        statement = (
+            delete(users_table)
+            .where(users_table.c.id == user_id)
+            .returning(*users_table.columns)
+        )
+        async with self.engine.begin() as conn:
+            row = (await conn.execute(statement)).first()
+        return user_row_to_dict(row) if row else None
+    
+    async def delete_users(self, user_ids, chunk_size=500):
+        """
+        Delete many users in one transaction
+        
+        Returns:
+            List of deleted user dicts in ID order
+        """
+        user_ids = sorted(set(user_ids))
+        deleted = []
+        async with self.engine.begin() as conn:
+            for start in range(0, len(user_ids), chunk_size):
+                statement = (
+                    delete(users_table)
+                    .where(users_table.c.id.in_(user_ids[start:start + chunk_size]))
+                    .returning(*users_table.columns)
+                )
+                deleted.extend(user_row_to_dict(row) for row in await conn.execute(statement))
+        
+        deleted.sort(key=lambda user: user['id'])
+        return deleted
+    
+    async def reset(self):
+        """Reset the database to initial state"""
+        async with self.engine.begin() as conn:
+            await conn.execute(delete(users_table))
+            
+            # Reset auto-increment (SQLite specific)
+            has_sequence = await conn.scalar(text(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_sequence'"
+            ))
+            if has_sequence:
+                await conn.execute(text("DELETE FROM sqlite_sequence WHERE name='users'"))
+        
+        await self._init_sample_data()
+    
+    async def _init_sample_data(self):
+        """Initialize with sample users for testing"""
+        for user_data in SAMPLE_USERS:
+            await self.create_user(user_data)
@@ -2,14 +2,64 @@
 SQLite database models and operations using SQLAlchemy
 """
 from datetime import datetime
+import hashlib
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 
+from cache import LRUCache
+
 db = SQLAlchemy()
 
+
+class DuplicateEmailError(Exception):
+    """Raised when a write would give a user an email that is already taken"""
+    pass
+
+
+# Users seeded into an empty database and restored by reset
+SAMPLE_USERS = [
+    {
+        "name": "Admin User",
+        "email": "admin@example.com",
+        "age": 30,
+        "role": "admin"
+    },
+    {
+        "name": "John Doe",
+        "email": "john@example.com",
+        "age": 25,
+        "role": "user"
+    }
+]
+
+
+def user_row_to_dict(row):
+    """
+    Convert a User object or a users table row to a dictionary
+    
+    Timestamps stay as datetime objects; the response serializer encodes
+    them as ISO 8601 strings.
+    """
+    return {
+        'id': row.id,
+        'name': row.name,
+        'email': row.email,
+        'age': row.age,
+        'role': row.role,
+        'created_at': row.created_at,
+        'updated_at': row.updated_at
+    }
+
+
 class User(db.Model):
     """User model for SQLite database"""
     __tablename__ = 'users'
+    __table_args__ = (
+        # Serves role-filtered listings as a range scan in ID order
+        db.Index('ix_users_role_id', 'role', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -21,94 +71,463 @@ class User(db.Model):
     
     def to_dict(self):
         """Convert user object to dictionary"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'email': self.email,
-            'age': self.age,
-            'role': self.role,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+        return user_row_to_dict(self)
     
     def __repr__(self):
         return f'<User {self.email}>'
 
 
+class TableVersion(db.Model):
+    """Per-table change counter, bumped by triggers on every write"""
+    __tablename__ = 'table_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Triggers keep the users version in step with every INSERT/UPDATE/DELETE,
+# whichever worker process or code path performs it
+USERS_VERSION_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_version_after_{event_name}
+    AFTER {event_name.upper()} ON users
+    BEGIN
+        UPDATE table_versions SET version = version + 1 WHERE name = 'users';
+    END
+    """
+    for event_name in ('insert', 'update', 'delete')
+]
+
+
+def user_etag(user_id, updated_at, fields=None):
+    """
+    Build the strong ETag for a single user
+    
+    Args:
+        user_id: User ID
+        updated_at: Last update time as a datetime or ISO 8601 string
+        fields: Field names of a sparse fieldset, or None for the full user
+    
+    Returns:
+        ETag value (without quotes)
+    """
+    if isinstance(updated_at, datetime):
+        updated_at = updated_at.isoformat()
+    key = f"{user_id}:{updated_at}"
+    if fields:
+        key += ":" + ",".join(fields)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+# Column names callers may request through sparse fieldsets
+USER_FIELDS = tuple(column.name for column in User.__table__.columns)
+
+
+def select_users():
+    """
+    Core SELECT of every users column
+    
+    Read paths execute this instead of querying User so rows come back as
+    plain tuples, skipping ORM hydration, the identity map and change
+    tracking; user_row_to_dict reads them by attribute like a User.
+    """
+    return db.select(*User.__table__.columns)
+
+
+def user_columns(fields, *required):
+    """Columns to SELECT for a fieldset, plus any the query itself needs"""
+    names = list(fields)
+    names.extend(name for name in required if name not in names)
+    return [User.__table__.c[name] for name in names]
+
+
 class UserStore:
     """User store operations using SQLAlchemy"""
     
+    # Serialized GET /users/<id> bodies keyed by user ID, as (ETag, body).
+    # Writes made here drop the entry at once; writes made by other worker
+    # processes are picked up when the entry's TTL runs out
+    cache = LRUCache()
+    
+    # Login lookups: user ID -> login details, raw email -> (email, user ID).
+    # Like cache, other workers' writes are picked up when the TTL runs out
+    login_cache = LRUCache()
+    login_email_cache = LRUCache()
+    
+    @staticmethod
+    def _invalidate(user_id):
+        """Drop every cached entry derived from a user's row"""
+        UserStore.cache.invalidate(user_id)
+        UserStore.login_cache.invalidate(user_id)
+    
+    @staticmethod
+    def _invalidate_all():
+        """Drop every cached entry"""
+        UserStore.cache.clear()
+        UserStore.login_cache.clear()
+        UserStore.login_email_cache.clear()
+    
     @staticmethod
     def create_user(user_data):
-        """Create a new user"""
+        """
+        Create a new user
+        
+        Uses a single INSERT ... ON CONFLICT DO NOTHING RETURNING statement,
+        so the duplicate-email check and the insert are one atomic step.
+        
+        Returns:
+            The created user dict, or None if the email already exists
+        """
+        statement = sqlite_insert(User).values(
+            name=user_data['name'],
+            email=user_data['email'],
+            age=user_data['age'],
+            role=user_data.get('role', 'user')
+        ).on_conflict_do_nothing(index_elements=['email']).returning(User)
+        
         try:
-            user = User(
-                name=user_data['name'],
-                email=user_data['email'],
-                age=user_data['age'],
-                role=user_data.get('role', 'user')
-            )
-            db.session.add(user)
+            user = db.session.scalars(statement).first()
             db.session.commit()
-            return user.to_dict()
         except IntegrityError:
             db.session.rollback()
             return None
+        
+        if not user:
+            return None
+        
+        UserStore._invalidate(user.id)
+        return user.to_dict()
+    
+    @staticmethod
+    def create_users_bulk(users_data):
+        """
+        Create many users in a single transaction
+        
+        Emails already in the table (or repeated earlier in the batch) are
+        found with one set-based query, and the remaining rows are written
+        with one executemany INSERT.
+        
+        Args:
+            users_data: List of validated user dictionaries
+        
+        Returns:
+            List aligned with users_data holding the created user dict, or
+            None where the email already exists
+        """
+        # One retry covers rows inserted concurrently between check and insert
+        for attempt in range(2):
+            taken = UserStore.existing_emails(u['email'] for u in users_data)
+            
+            rows = []
+            positions = []
+            for position, user_data in enumerate(users_data):
+                if user_data['email'] in taken:
+                    continue
+                taken.add(user_data['email'])
+                positions.append(position)
+                rows.append({
+                    'name': user_data['name'],
+                    'email': user_data['email'],
+                    'age': user_data['age'],
+                    'role': user_data.get('role', 'user')
+                })
+            
+            results = [None] * len(users_data)
+            if not rows:
+                return results
+            
+            try:
+                created = db.session.scalars(
+                    db.insert(User).returning(User, sort_by_parameter_order=True),
+                    rows
+                ).all()
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+                if attempt:
+                    raise
+                continue
+            
+            for position, user in zip(positions, created):
+                UserStore._invalidate(user.id)
+                results[position] = user.to_dict()
+            return results
+    
+    @staticmethod
+    def existing_emails(emails, chunk_size=500):
+        """
+        Return the subset of emails that already belong to a user
+        
+        Lookups are batched into IN queries to stay under SQLite's bound
+        parameter limit.
+        """
+        emails = list(set(emails))
+        found = set()
+        for start in range(0, len(emails), chunk_size):
+            chunk = emails[start:start + chunk_size]
+            found.update(db.session.scalars(
+                db.select(User.email).where(User.email.in_(chunk))
+            ))
+        return found
     
     @staticmethod
     def get_user_by_id(user_id):
         """Get user by ID"""
-        user = User.query.get(user_id)
-        return user.to_dict() if user else None
+        row = db.session.execute(select_users().where(User.id == user_id)).first()
+        return user_row_to_dict(row) if row else None
+    
+    @staticmethod
+    def get_user_fields(user_id, fields):
+        """
+        Get selected fields of a user with a column-restricted SELECT
+        
+        Args:
+            user_id: User ID
+            fields: Validated list of column names
+        
+        Returns:
+            Tuple of (dict holding only the requested fields, ETag for this
+            fieldset), or (None, None) if the user does not exist
+        """
+        row = db.session.execute(
+            db.select(*user_columns(fields, 'updated_at')).where(User.id == user_id)
+        ).mappings().first()
+        if not row:
+            return None, None
+        return {name: row[name] for name in fields}, user_etag(user_id, row['updated_at'], fields)
+    
+    @staticmethod
+    def get_user_etag(user_id, fields=None):
+        """Get a user's ETag from its updated_at column alone, or None"""
+        updated_at = db.session.scalar(
+            db.select(User.updated_at).where(User.id == user_id)
+        )
+        return user_etag(user_id, updated_at, fields) if updated_at else None
+    
+    @staticmethod
+    def get_users_version():
+        """Get the change counter for the users table"""
+        return db.session.scalar(
+            db.select(TableVersion.version).where(TableVersion.name == 'users')
+        ) or 0
     
     @staticmethod
     def get_user_by_email(email):
         """Get user by email"""
-        user = User.query.filter_by(email=email).first()
-        return user.to_dict() if user else None
+        row = db.session.execute(select_users().where(User.email == email)).first()
+        return user_row_to_dict(row) if row else None
+    
+    @staticmethod
+    def get_login_user(raw_email, normalize):
+        """
+        Get the details needed to log a user in, with caching
+        
+        The raw email string is mapped to its normalized form and user ID,
+        so repeat logins skip both email normalization and the database.
+        Cached entries are dropped whenever this process updates or deletes
+        the user; a change made by another worker (e.g. a new role) is seen
+        once the entry's LOGIN_CACHE_TTL_SECONDS runs out. An index entry is
+        only trusted if the cached email still matches.
+        
+        Args:
+            raw_email: Email exactly as submitted by the client
+            normalize: Callable returning the normalized email (may raise)
+        
+        Returns:
+            Dictionary with id, name, email and role, or None if not found
+        """
+        cached = UserStore.login_email_cache.get(raw_email)
+        if cached is not None:
+            email, user_id = cached
+            login_user = UserStore.login_cache.get(user_id)
+            if login_user is not None and login_user['email'] == email:
+                return login_user
+        else:
+            email = normalize(raw_email)
+        
+        generation = UserStore.login_cache.generation
+        user = db.session.execute(
+            db.select(User.id, User.name, User.email, User.role).where(User.email == email)
+        ).first()
+        if not user:
+            return None
+        
+        login_user = {
+            'id': user.id,
+            'name': user.name,
+            'email': user.email,
+            'role': user.role
+        }
+        UserStore.login_cache.set(user.id, login_user, generation=generation)
+        UserStore.login_email_cache.set(raw_email, (email, user.id))
+        return login_user
     
     @staticmethod
     def get_all_users():
         """Get all users"""
-        users = User.query.all()
-        return [user.to_dict() for user in users]
+        return [user_row_to_dict(row) for row in db.session.execute(select_users())]
+    
+    @staticmethod
+    def get_users_page(limit, after_id=None, role=None, fields=None):
+        """
+        Get one page of users ordered by ID (keyset pagination)
+        
+        Fetches one extra row to detect whether another page exists, so each
+        page is a primary-key range scan regardless of table size. When a
+        role is given the scan runs on the (role, id) index instead. A
+        fieldset restricts the SELECT to those columns and skips the ORM.
+        
+        Returns:
+            Tuple of (list of user dicts, last ID on the page or None if
+            this is the final page)
+        """
+        if fields:
+            query = db.select(*user_columns(fields, 'id'))
+        else:
+            query = select_users()
+        if role is not None:
+            query = query.where(User.role == role)
+        if after_id is not None:
+            query = query.where(User.id > after_id)
+        query = query.order_by(User.id).limit(limit + 1)
+        
+        if fields:
+            rows = db.session.execute(query).mappings().all()
+        else:
+            rows = db.session.execute(query).all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        if fields:
+            next_after_id = rows[-1]['id'] if has_more else None
+            users = [{name: row[name] for name in fields} for row in rows]
+        else:
+            next_after_id = rows[-1].id if has_more else None
+            users = [user_row_to_dict(row) for row in rows]
+        return users, next_after_id
+    
+    @staticmethod
+    def iter_users(batch_size=1000, role=None):
+        """
+        Iterate over all users in ID order without loading the whole table
+        
+        Rows are fetched from the cursor in batches of batch_size, so memory
+        use stays flat however many users there are.
+        
+        Yields:
+            User dictionaries
+        """
+        query = select_users().order_by(User.id)
+        if role is not None:
+            query = query.where(User.role == role)
+        
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        for row in result:
+            yield user_row_to_dict(row)
     
     @staticmethod
     def update_user(user_id, user_data):
-        """Update an existing user"""
-        user = User.query.get(user_id)
-        if not user:
-            return None
+        """
+        Update an existing user
+        
+        Runs one UPDATE ... RETURNING that sets only the provided fields
+        plus updated_at, so no separate existence or email check is needed.
+        
+        Returns:
+            The updated user dict, or None if the user does not exist
+        
+        Raises:
+            DuplicateEmailError: If the new email belongs to another user
+        """
+        # Update only provided fields
+        values = {
+            field: user_data[field]
+            for field in ('name', 'email', 'age', 'role')
+            if field in user_data
+        }
+        values['updated_at'] = datetime.utcnow()
+        
+        statement = (
+            db.update(User)
+            .where(User.id == user_id)
+            .values(**values)
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
         
         try:
-            # Update only provided fields
-            if 'name' in user_data:
-                user.name = user_data['name']
-            if 'email' in user_data:
-                user.email = user_data['email']
-            if 'age' in user_data:
-                user.age = user_data['age']
-            if 'role' in user_data:
-                user.role = user_data['role']
-            
-            user.updated_at = datetime.utcnow()
+            user = db.session.scalars(statement).first()
             db.session.commit()
-            return user.to_dict()
         except IntegrityError:
             db.session.rollback()
+            raise DuplicateEmailError(user_data.get('email'))
+        
+        if not user:
             return None
+        
+        UserStore._invalidate(user_id)
+        return user.to_dict()
     
     @staticmethod
     def delete_user(user_id):
-        """Delete a user"""
-        user = User.query.get(user_id)
-        if not user:
-            return None
+        """
+        Delete a user
         
-        user_dict = user.to_dict()
-        db.session.delete(user)
+        Uses one DELETE ... RETURNING statement instead of loading the
+        ORM object first.
+        
+        Returns:
+            The deleted user dict, or None if the user does not exist
+        """
+        statement = (
+            db.delete(User)
+            .where(User.id == user_id)
+            .returning(*User.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        row = db.session.execute(statement).first()
         db.session.commit()
-        return user_dict
+        
+        if not row:
+            return None
+        
+        UserStore._invalidate(user_id)
+        return user_row_to_dict(row)
+    
+    @staticmethod
+    def delete_users(user_ids, chunk_size=500):
+        """
+        Delete many users in one transaction
+        
+        Args:
+            user_ids: Iterable of user IDs
+        
+        Returns:
+            List of deleted user dicts in ID order; IDs that did not exist
+            are simply absent
+        """
+        user_ids = sorted(set(user_ids))
+        deleted = []
+        try:
+            for start in range(0, len(user_ids), chunk_size):
+                statement = (
+                    db.delete(User)
+                    .where(User.id.in_(user_ids[start:start + chunk_size]))
+                    .returning(*User.__table__.columns)
+                    .execution_options(synchronize_session=False)
+                )
+                deleted.extend(user_row_to_dict(row) for row in db.session.execute(statement))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        for user in deleted:
+            UserStore._invalidate(user['id'])
+        
+        deleted.sort(key=lambda user: user['id'])
+        return deleted
     
     @staticmethod
     def email_exists(email, exclude_user_id=None):
@@ -141,37 +560,112 @@ class UserStore:
         except Exception as e:
             db.session.rollback()
             raise e
+        finally:
+            UserStore._invalidate_all()
     
     @staticmethod
     def _init_sample_data():
         """Initialize with sample users for testing"""
-        sample_users = [
-            {
-                "name": "Admin User",
-                "email": "admin@example.com",
-                "age": 30,
-                "role": "admin"
-            },
-            {
-                "name": "John Doe",
-                "email": "john@example.com",
-                "age": 25,
-                "role": "user"
-            }
-        ]
-        
-        for user_data in sample_users:
+        for user_data in SAMPLE_USERS:
             UserStore.create_user(user_data)
 
 
-def init_db(app):
-    """Initialize the database with the Flask app"""
+def sqlite_pragmas(config):
+    """Build the PRAGMA statements to run on each new SQLite connection"""
+    # busy_timeout goes first so switching a new database to WAL waits for
+    # other connections instead of failing with "database is locked"
+    return [
+        f"PRAGMA busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+        f"PRAGMA journal_mode={config.get('SQLITE_JOURNAL_MODE', 'WAL')}",
+        f"PRAGMA synchronous={config.get('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+        f"PRAGMA mmap_size={int(config.get('SQLITE_MMAP_SIZE', 0))}",
+        f"PRAGMA cache_size={int(config.get('SQLITE_CACHE_SIZE', -2000))}",
+    ]
+
+
+def configure_engine(app):
+    """
+    Apply the configured SQLite pragmas to every pooled connection
+    
+    WAL lets readers proceed while a writer commits, and synchronous=NORMAL
+    drops the per-commit fsync that the rollback journal needs.
+    """
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    pragmas = sqlite_pragmas(app.config)
+    
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def init_db(app, create_schema=True):
+    """
+    Initialize the database with the Flask app
+    
+    Args:
+        app: Flask application
+        create_schema: Create tables, triggers and seed data now. Pass False
+            to defer that work to init_schema(), e.g. until the first request
+    """
     db.init_app(app)
     
+    UserStore.cache.configure(
+        max_size=app.config.get('USER_CACHE_MAX_SIZE', 1024),
+        ttl=app.config.get('USER_CACHE_TTL_SECONDS', 10)
+    )
+    for login_cache in (UserStore.login_cache, UserStore.login_email_cache):
+        login_cache.configure(
+            max_size=app.config.get('LOGIN_CACHE_MAX_SIZE', 1024),
+            ttl=app.config.get('LOGIN_CACHE_TTL_SECONDS', 30)
+        )
+    
+    with app.app_context():
+        # Configure connections before the first one is opened
+        configure_engine(app)
+    
+    if create_schema:
+        init_schema(app)
+
+
+def init_schema(app):
+    """
+    Create tables, indexes and triggers, and seed an empty database
+    
+    Safe to run from several processes at once (e.g. gunicorn workers each
+    initializing on their first request): on SQLite the whole setup runs
+    under the database write lock, so the others wait and then find the
+    tables and seed data already in place.
+    """
     with app.app_context():
+        connection = db.session.connection()
+        if connection.dialect.name == 'sqlite':
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        
         # Create tables
-        db.create_all()
+        db.metadata.create_all(connection)
+        
+        # create_all skips indexes on tables that already exist
+        for index in User.__table__.indexes:
+            index.create(connection, checkfirst=True)
         
-        # Seed initial data if database is empty
+        # Seed the users version counter and the triggers that maintain it
+        db.session.execute(db.text(
+            "INSERT OR IGNORE INTO table_versions (name, version) VALUES ('users', 0)"
+        ))
+        for trigger in USERS_VERSION_TRIGGERS:
+            db.session.execute(db.text(trigger))
+        
+        # Seed initial data if database is empty; the first insert commits
+        # the schema with it and releases the lock
         if User.query.count() == 0:
             UserStore._init_sample_data()
+        else:
+            db.session.commit()
@@ -0,0 +1,54 @@
+"""
+Per-process background sync threads
+
+The revocation list and the metrics registry both keep their state in
+memory and sync it with a shared file every few seconds. Their thread is
+started on first use rather than at import, so each worker forked from a
+preloading gunicorn master starts its own.
+"""
+import logging
+import os
+import threading
+import time
+
+
+class PeriodicSync:
+    """Calls a function every interval seconds from one daemon thread per process"""
+    
+    def __init__(self, func, interval, description, logger=None, on_start=None):
+        """
+        Args:
+            func: Function to call; an OSError it raises is logged
+            interval: Seconds between calls
+            description: What func does, for the failure warning
+            logger: Logger for the failure warning (this module's by default)
+            on_start: Called once in each process, just before its thread starts
+        """
+        self.func = func
+        self.interval = interval
+        self.description = description
+        self.logger = logger or logging.getLogger(__name__)
+        self.on_start = on_start
+        self._lock = threading.Lock()
+        self._pid = None
+    
+    def ensure_started(self):
+        """Start this process's thread unless it is already running"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Other threads wait here until on_start is done
+            if self.on_start is not None:
+                self.on_start()
+            self._pid = os.getpid()
+        threading.Thread(target=self._run, daemon=True).start()
+    
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.func()
+            except OSError as e:
+                self.logger.warning(f"{self.description} failed: {str(e)}")
@@ -1,7 +1,103 @@
 """
 Response helper functions for consistent API responses
 """
-from flask import jsonify
+import json
+import os
+from collections import namedtuple
+from datetime import date, datetime
+from flask import Response, stream_with_context
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover - optional dependency
+    ujson = None
+
+
+def _default(obj):
+    """Encode values the stdlib and ujson encoders do not handle natively"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj, default=_default)
+
+
+def _ujson_dumps(obj):
+    return ujson.dumps(
+        obj,
+        ensure_ascii=False,
+        escape_forward_slashes=False,
+        default=_default
+    ).encode("utf-8")
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=_default
+    ).encode("utf-8")
+
+
+JSON_BACKENDS = {
+    "orjson": _orjson_dumps if orjson else None,
+    "ujson": _ujson_dumps if ujson else None,
+    "json": _stdlib_dumps,
+}
+
+json_backend = None
+dumps = None
+
+
+def set_json_backend(name="auto"):
+    """
+    Select the JSON encoder used by every response helper
+    
+    Args:
+        name: "orjson", "ujson", "json" or "auto" (fastest one installed)
+    
+    Returns:
+        Name of the backend now in use
+    
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    global json_backend, dumps
+    
+    if name == "auto":
+        name = next(n for n in ("orjson", "ujson", "json") if JSON_BACKENDS[n])
+    
+    if not JSON_BACKENDS.get(name):
+        raise ValueError(f"JSON backend '{name}' is not available")
+    
+    json_backend = name
+    dumps = JSON_BACKENDS[name]
+    return name
+
+
+set_json_backend(os.environ.get("JSON_BACKEND", "auto"))
+
+
+def json_response(payload, status_code=200):
+    """
+    Encode a payload with the selected JSON backend
+    
+    Args:
+        payload: JSON-serializable object (datetimes are encoded as ISO 8601)
+        status_code: HTTP status code
+    
+    Returns:
+        Flask response object
+    """
+    return Response(dumps(payload), status=status_code, mimetype="application/json")
 
 
 def success_response(data=None, message="Operation successful", status_code=200):
@@ -24,10 +120,10 @@ def success_response(data=None, message="Operation successful", status_code=200)
     if data is not None:
         response["data"] = data
     
-    return jsonify(response), status_code
+    return json_response(response), status_code
 
 
-def error_response(message, error_code="ERROR", status_code=400):
+def error_response(message, error_code="ERROR", status_code=400, errors=None):
     """
     Create a standardized error response
     
@@ -35,6 +131,7 @@ def error_response(message, error_code="ERROR", status_code=400):
         message: Error message
         error_code: Error code identifier
         status_code: HTTP status code
+        errors: Optional list of per-field errors
     
     Returns:
         Flask response object
@@ -44,5 +141,210 @@ def error_response(message, error_code="ERROR", status_code=400):
         "error_code": error_code,
         "message": message
     }
+    if errors:
+        response["errors"] = errors
+    
+    return json_response(response), status_code
+
+
+# Pre-encoded error envelope: immutable JSON bytes plus the HTTP status
+StaticError = namedtuple("StaticError", ["body", "status_code"])
+
+
+def prerender_error(message, error_code="ERROR", status_code=400):
+    """
+    Encode a fixed error envelope once so it can be served without
+    building a dict or running the encoder on every request
+    
+    Args:
+        message: Error message
+        error_code: Error code identifier
+        status_code: HTTP status code
+    
+    Returns:
+        StaticError holding the encoded body and status code
+    """
+    body = dumps({
+        "status": "error",
+        "error_code": error_code,
+        "message": message
+    })
+    return StaticError(body, status_code)
+
+
+def static_error_response(error):
+    """
+    Create a response from a pre-rendered error
+    
+    Args:
+        error: StaticError from prerender_error
+    
+    Returns:
+        Flask response object
+    """
+    return Response(error.body, status=error.status_code, mimetype="application/json")
+
+
+NOT_FOUND_ERROR = prerender_error(
+    "The requested resource was not found", "NOT_FOUND", 404
+)
+INTERNAL_SERVER_ERROR = prerender_error(
+    "Internal server error occurred", "INTERNAL_SERVER_ERROR", 500
+)
+TOKEN_EXPIRED_ERROR = prerender_error(
+    "Token has expired. Please login again.", "TOKEN_EXPIRED", 401
+)
+INVALID_TOKEN_ERROR = prerender_error(
+    "Invalid token. Please provide a valid authentication token.", "INVALID_TOKEN", 401
+)
+INVALID_SIGNATURE_ERROR = prerender_error(
+    "Invalid token signature.", "INVALID_TOKEN", 401
+)
+TOKEN_REVOKED_ERROR = prerender_error(
+    "Token has been revoked. Please login again.", "TOKEN_REVOKED", 401
+)
+MISSING_TOKEN_ERROR = prerender_error(
+    "Authorization token is missing. Please include a valid token in the request.",
+    "MISSING_TOKEN", 401
+)
+UNAUTHORIZED_ERROR = prerender_error(
+    "Authentication required. Please provide a valid token.", "UNAUTHORIZED", 401
+)
+FORBIDDEN_ERROR = prerender_error(
+    "Admin access required. You do not have permission to perform this action.",
+    "FORBIDDEN", 403
+)
+MISSING_BODY_ERROR = prerender_error(
+    "Request body is required", "MISSING_BODY", 400
+)
+DUPLICATE_EMAIL_ERROR = prerender_error(
+    "Email already exists. Please use a different email.", "DUPLICATE_EMAIL", 409
+)
+INVALID_FILTER_ERROR = prerender_error(
+    "Invalid role filter. Must be 'admin' or 'user'", "INVALID_FILTER", 400
+)
+
+# 405 bodies name the method, so they are rendered once per standard method
+METHOD_NOT_ALLOWED_ERRORS = {
+    method: prerender_error(
+        f"Method {method} not allowed for this endpoint", "METHOD_NOT_ALLOWED", 405
+    )
+    for method in ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT")
+}
+
+
+def method_not_allowed_response(method):
+    """
+    Create a 405 response for the given HTTP method
+    
+    Args:
+        method: Request method
+    
+    Returns:
+        Flask response object
+    """
+    error = METHOD_NOT_ALLOWED_ERRORS.get(method)
+    if error is None:
+        return error_response(
+            message=f"Method {method} not allowed for this endpoint",
+            error_code="METHOD_NOT_ALLOWED",
+            status_code=405
+        )
+    return static_error_response(error)
+
+
+def raw_json_response(body, status_code=200):
+    """
+    Create a response from an already-encoded JSON body
+    
+    Args:
+        body: JSON document as bytes
+        status_code: HTTP status code
+    
+    Returns:
+        Flask response object
+    """
+    return Response(body, status=status_code, mimetype="application/json")
+
+
+def not_modified_response(etag):
+    """
+    Create an empty 304 Not Modified response
+    
+    Args:
+        etag: ETag value the client already holds
+    
+    Returns:
+        Flask response object
+    """
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+
+def _chunked(lines, chunk_size):
+    """Group encoded lines so each write to the socket carries many records"""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= chunk_size:
+            yield b"".join(buffer)
+            buffer = []
+    if buffer:
+        yield b"".join(buffer)
+
+
+def ndjson_stream_response(records, chunk_size=500, status_code=200):
+    """
+    Create a streaming newline-delimited JSON response
+    
+    Args:
+        records: Iterable of JSON-serializable objects, one per line
+        chunk_size: Number of records written per chunk
+        status_code: HTTP status code
+    
+    Returns:
+        Flask streaming response object
+    """
+    lines = (dumps(record) + b"\n" for record in records)
+    return Response(
+        stream_with_context(_chunked(lines, chunk_size)),
+        status=status_code,
+        mimetype="application/x-ndjson"
+    )
+
+
+def json_array_stream_response(records, message="Operation successful", key="items",
+                               chunk_size=500, status_code=200):
+    """
+    Create a streaming success response whose data holds a JSON array
+    
+    The body has the same envelope as success_response, with the array
+    written element by element followed by its count.
+    
+    Args:
+        records: Iterable of JSON-serializable objects
+        message: Success message
+        key: Name of the array inside data
+        chunk_size: Number of records written per chunk
+        status_code: HTTP status code
+    
+    Returns:
+        Flask streaming response object
+    """
+    def generate():
+        yield (
+            b'{"status":"success","message":' + dumps(message) +
+            b',"data":{' + dumps(key) + b':['
+        )
+        count = 0
+        for record in records:
+            yield (b"," if count else b"") + dumps(record)
+            count += 1
+        yield b'],"count":' + str(count).encode("ascii") + b'}}'
     
-    return jsonify(response), status_code
+    return Response(
+        stream_with_context(_chunked(generate(), chunk_size)),
+        status=status_code,
+        mimetype="application/json"
+    )
@@ -0,0 +1,163 @@
+"""
+Response helper functions for the ASGI (Quart) deployment mode
+
+Same envelopes and pre-rendered error bodies as responses.py, wrapped in
+Quart response objects.
+"""
+from quart import Response
+
+import responses
+
+
+def success_response(data=None, message="Operation successful", status_code=200):
+    """
+    Create a standardized success response
+    
+    Args:
+        data: Response data (dict, list, or None)
+        message: Success message
+        status_code: HTTP status code
+    
+    Returns:
+        Quart response object
+    """
+    response = {
+        "status": "success",
+        "message": message
+    }
+    
+    if data is not None:
+        response["data"] = data
+    
+    return Response(responses.dumps(response), status=status_code, mimetype="application/json")
+
+
+def error_response(message, error_code="ERROR", status_code=400, errors=None):
+    """
+    Create a standardized error response
+    
+    Args:
+        message: Error message
+        error_code: Error code identifier
+        status_code: HTTP status code
+        errors: Optional list of per-field errors
+    
+    Returns:
+        Quart response object
+    """
+    response = {
+        "status": "error",
+        "error_code": error_code,
+        "message": message
+    }
+    if errors:
+        response["errors"] = errors
+    
+    return Response(responses.dumps(response), status=status_code, mimetype="application/json")
+
+
+def static_error_response(error):
+    """
+    Create a response from a pre-rendered error
+    
+    Args:
+        error: StaticError from responses.prerender_error
+    
+    Returns:
+        Quart response object
+    """
+    return Response(error.body, status=error.status_code, mimetype="application/json")
+
+
+def method_not_allowed_response(method):
+    """Create a 405 response for the given HTTP method"""
+    error = responses.METHOD_NOT_ALLOWED_ERRORS.get(method)
+    if error is None:
+        return error_response(
+            message=f"Method {method} not allowed for this endpoint",
+            error_code="METHOD_NOT_ALLOWED",
+            status_code=405
+        )
+    return static_error_response(error)
+
+
+def raw_json_response(body, status_code=200):
+    """Create a response from an already-encoded JSON body"""
+    return Response(body, status=status_code, mimetype="application/json")
+
+
+def not_modified_response(etag):
+    """Create an empty 304 Not Modified response"""
+    response = Response(b"", status=304)
+    response.set_etag(etag)
+    return response
+
+
+async def _chunked(lines, chunk_size):
+    """Group encoded lines so each write to the socket carries many records"""
+    buffer = []
+    async for line in lines:
+        buffer.append(line)
+        if len(buffer) >= chunk_size:
+            yield b"".join(buffer)
+            buffer = []
+    if buffer:
+        yield b"".join(buffer)
+
+
+def ndjson_stream_response(records, chunk_size=500, status_code=200):
+    """
+    Create a streaming newline-delimited JSON response
+    
+    Args:
+        records: Async iterable of JSON-serializable objects, one per line
+        chunk_size: Number of records written per chunk
+        status_code: HTTP status code
+    
+    Returns:
+        Quart streaming response object
+    """
+    async def lines():
+        async for record in records:
+            yield responses.dumps(record) + b"\n"
+    
+    return Response(
+        _chunked(lines(), chunk_size),
+        status=status_code,
+        mimetype="application/x-ndjson"
+    )
+
+
+def json_array_stream_response(records, message="Operation successful", key="items",
+                               chunk_size=500, status_code=200):
+    """
+    Create a streaming success response whose data holds a JSON array
+    
+    Args:
+        records: Async iterable of JSON-serializable objects
+        message: Success message
+        key: Name of the array inside data
+        chunk_size: Number of records written per chunk
+        status_code: HTTP status code
+    
+    Returns:
+        Quart streaming response object
+    """
+    dumps = responses.dumps
+    
+    async def generate():
+        yield (
+            b'{"status":"success","message":' + dumps(message) +
+            b',"data":{' + dumps(key) + b':['
+        )
+        count = 0
+        async for record in records:
+            yield (b"," if count else b"") + dumps(record)
+            count += 1
+        yield b'],"count":' + str(count).encode("ascii") + b'}}'
+    
+    return Response(
+        _chunked(generate(), chunk_size),
+        status=status_code,
+        mimetype="application/json"
+    )
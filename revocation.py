@@ -0,0 +1,198 @@
+"""
+Revoked-token list
+
+Revoked token IDs (the "jti" claim) are kept in memory as 16-byte keys
+mapped to the token's expiry, so a lookup is a single dict probe and an
+entry can be dropped once the token would have expired anyway.
+
+When a file is configured it is an append-only log of those records: each
+revocation is appended to it before revoke() returns, so it survives the
+worker that handled it. A background thread reads what other worker
+processes appended every sync interval, and rewrites the file without its
+expired records once they make up most of it. Appends and the rewrite take
+an flock on the file so they never interleave (on platforms without fcntl
+the file is only appended to and never rewritten).
+"""
+from contextlib import contextmanager
+import hashlib
+import logging
+import os
+import struct
+import threading
+import time
+import uuid
+
+from periodic import PeriodicSync
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# One record per revoked token: 16-byte jti key, expiry as Unix seconds
+RECORD = struct.Struct(">16sQ")
+
+# The file is rewritten once it is larger than this and more than half of
+# its records are expired or superseded
+COMPACT_MIN_BYTES = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+def jti_key(jti):
+    """Compact 16-byte key for a jti (its UUID bytes, or a digest otherwise)"""
+    try:
+        return uuid.UUID(jti).bytes
+    except (ValueError, TypeError, AttributeError):
+        return hashlib.sha256(str(jti).encode()).digest()[:16]
+
+
+def _flock(fd, exclusive):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+
+def _funlock(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class RevocationList:
+    """Thread-safe set of revoked token IDs with optional file persistence"""
+    
+    def __init__(self, path=None, sync_interval=30):
+        self.path = path
+        self.sync_interval = sync_interval
+        self._revoked = {}
+        self._lock = threading.Lock()
+        
+        # Started on first use in each process; a new worker first catches
+        # up on everything revoked since it was forked
+        self._syncer = PeriodicSync(
+            self.sync, sync_interval, "Revocation list sync", logger,
+            on_start=self._read_new if path else None
+        )
+        
+        # File state: this process's descriptor and how far it has read
+        self._io_lock = threading.Lock()
+        self._fd = None
+        self._fd_pid = None
+        self._offset = 0
+        
+        if path:
+            self._read_new()
+            self._prune()
+    
+    def revoke(self, jti, exp):
+        """Revoke a token until its expiry (Unix seconds)"""
+        self._syncer.ensure_started()
+        key = jti_key(jti)
+        exp = int(exp)
+        self._merge({key: exp})
+        
+        if self.path:
+            with self._locked_file() as fd:
+                os.write(fd, RECORD.pack(key, exp))
+    
+    def is_revoked(self, jti):
+        """Return True if the token with this jti has been revoked"""
+        self._syncer.ensure_started()
+        return jti_key(jti) in self._revoked
+    
+    def __len__(self):
+        return len(self._revoked)
+    
+    def sync(self):
+        """Load what other processes revoked, drop expired entries, compact the file"""
+        if self.path:
+            self._read_new()
+        self._prune()
+        
+        if self.path and fcntl is not None:
+            live_bytes = len(self._revoked) * RECORD.size
+            if self._offset > max(COMPACT_MIN_BYTES, 2 * live_bytes):
+                self._compact()
+    
+    def close(self):
+        """Close this process's handle on the file (e.g. when a worker exits)"""
+        with self._io_lock:
+            if self._fd is not None and self._fd_pid == os.getpid():
+                os.close(self._fd)
+            self._fd = None
+            self._fd_pid = None
+    
+    @contextmanager
+    def _locked_file(self, exclusive=False):
+        """
+        Yield a descriptor for the current file, holding its flock
+        
+        Each process opens the file itself, as flock locks belong to the
+        open file and forked children would otherwise share the parent's.
+        If the file was replaced by a compaction since it was opened, it is
+        reopened and read again from the start.
+        """
+        with self._io_lock:
+            while True:
+                if self._fd is None or self._fd_pid != os.getpid():
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+                    self._fd_pid = os.getpid()
+                    self._offset = 0
+                
+                _flock(self._fd, exclusive)
+                try:
+                    current = os.stat(self.path).st_ino == os.fstat(self._fd).st_ino
+                except FileNotFoundError:
+                    current = False
+                if current:
+                    break
+                
+                _funlock(self._fd)
+                os.close(self._fd)
+                self._fd = None
+            
+            try:
+                yield self._fd
+            finally:
+                _funlock(self._fd)
+    
+    def _read_new(self):
+        with self._locked_file() as fd:
+            records = self._read_from(fd)
+        self._merge(records)
+    
+    def _read_from(self, fd):
+        # Called with the file locked; returns the records past self._offset
+        os.lseek(fd, self._offset, os.SEEK_SET)
+        chunks = []
+        while True:
+            chunk = os.read(fd, 1024 * 1024)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        data = b"".join(chunks)
+        usable = len(data) - len(data) % RECORD.size
+        self._offset += usable
+        return dict(RECORD.iter_unpack(data[:usable]))
+    
+    def _compact(self):
+        with self._locked_file(exclusive=True) as fd:
+            self._merge(self._read_from(fd))
+            self._prune()
+            with self._lock:
+                records = b"".join(RECORD.pack(key, exp) for key, exp in self._revoked.items())
+            
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(records)
+            os.replace(tmp_path, self.path)
+    
+    def _merge(self, revoked):
+        with self._lock:
+            for key, exp in revoked.items():
+                if exp > self._revoked.get(key, 0):
+                    self._revoked[key] = exp
+    
+    def _prune(self):
+        now = time.time()
+        with self._lock:
+            self._revoked = {key: exp for key, exp in self._revoked.items() if exp > now}
@@ -2,11 +2,14 @@
 Simple test script to verify API is working correctly
 Run this after starting the API server to test basic functionality
 """
+import base64
+import os
 import requests
 import json
 from time import sleep
 
-BASE_URL = "http://127.0.0.1:5000"
+# Point at another server, e.g. the ASGI app: API_BASE_URL=http://127.0.0.1:8000
+BASE_URL = os.environ.get("API_BASE_URL", "http://127.0.0.1:5000")
 
 def print_section(title):
     """Print a section header"""
@@ -52,6 +55,7 @@ def run_tests():
         if passed:
             admin_token = response.json()["data"]["token"]
             admin_headers = {"Authorization": f"Bearer {admin_token}"}
+            admin_refresh_headers = {"Authorization": f"Bearer {response.json()['data']['refresh_token']}"}
         else:
             print("  Cannot continue without admin token")
             return
@@ -260,6 +264,305 @@ def run_tests():
         print_result("Reset data store", False)
         print(f"  Error: {str(e)}")
     
+    # Test 17: Refresh Token
+    print_section("Test 10: Token Refresh and Revocation")
+    try:
+        response = requests.post(f"{BASE_URL}/refresh", headers=admin_refresh_headers)
+        passed = response.status_code == 200 and "token" in response.json()["data"]
+        print_result("Refresh access token with refresh token", passed, response)
+        
+        if passed:
+            response = requests.get(
+                f"{BASE_URL}/users/1",
+                headers={"Authorization": f"Bearer {response.json()['data']['token']}"}
+            )
+            passed = response.status_code == 200
+            print_result("Use refreshed access token", passed, response)
+    except Exception as e:
+        print_result("Refresh access token with refresh token", False)
+        print(f"  Error: {str(e)}")
+    
+    # Test 18: Access Token Refused by /refresh
+    try:
+        response = requests.post(f"{BASE_URL}/refresh", headers=admin_headers)
+        passed = response.status_code == 401
+        print_result("Refresh with access token (expect 401)", passed, response)
+    except Exception as e:
+        print_result("Refresh with access token", False)
+        print(f"  Error: {str(e)}")
+    
+    # Test 19: Logout and Revoked Tokens
+    try:
+        response = requests.post(f"{BASE_URL}/login", json={"email": "john@example.com"})
+        tokens = response.json()["data"]
+        access_headers = {"Authorization": f"Bearer {tokens['token']}"}
+        refresh_headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+        
+        response = requests.post(f"{BASE_URL}/logout", headers=access_headers)
+        if response.status_code == 501:
+            print("- SKIP - Revocation checks (start the server with JWT_REVOCATION_ENABLED=1)")
+        else:
+            passed = response.status_code == 200
+            print_result("Logout revokes access token", passed, response)
+            
+            response = requests.post(
+                f"{BASE_URL}/users",
+                headers=access_headers,
+                json={"name": "Revoked User", "email": "revoked@example.com", "age": 30}
+            )
+            passed = response.status_code == 401 and response.json()["error_code"] == "TOKEN_REVOKED"
+            print_result("Use revoked access token (expect 401 TOKEN_REVOKED)", passed, response)
+            
+            response = requests.post(f"{BASE_URL}/logout", headers=refresh_headers)
+            passed = response.status_code == 200
+            print_result("Logout revokes refresh token", passed, response)
+            
+            response = requests.post(f"{BASE_URL}/refresh", headers=refresh_headers)
+            passed = response.status_code == 401 and response.json()["error_code"] == "TOKEN_REVOKED"
+            print_result("Refresh with revoked token (expect 401 TOKEN_REVOKED)", passed, response)
+    except Exception as e:
+        print_result("Logout and revoked tokens", False)
+        print(f"  Error: {str(e)}")
+    
+    # Test 20: Cursor Pagination
+    print_section("Test 11: Pagination")
+    try:
+        response = requests.get(f"{BASE_URL}/users", params={"limit": 1})
+        first = response.json()["data"]
+        passed = response.status_code == 200 and first["count"] == 1 and first["next_cursor"]
+        print_result("First page with next_cursor", passed, response)
+        
+        response = requests.get(f"{BASE_URL}/users", params={"limit": 1, "cursor": first["next_cursor"]})
+        second = response.json()["data"]
+        passed = response.status_code == 200 and second["users"][0]["id"] > first["users"][0]["id"]
+        print_result("Next page from cursor", passed, response)
+        
+        response = requests.get(f"{BASE_URL}/users", params={"after_id": second["users"][0]["id"]})
+        passed = response.status_code == 200 and all(
+            u["id"] > second["users"][0]["id"] for u in response.json()["data"]["users"]
+        )
+        print_result("Page after a given after_id", passed, response)
+    except Exception as e:
+        print_result("Cursor pagination", False)
+        print(f"  Error: {str(e)}")
+    
+    # Test 21: Invalid Pagination Parameters
+    try:
+        response = requests.get(f"{BASE_URL}/users", params={"limit": 0})
+        passed = response.status_code == 400 and response.json()["error_code"] == "INVALID_LIMIT"
+        print_result("Limit of 0 (expect 400)", passed, response)
+        
+        response = requests.get(f"{BASE_URL}/users", params={"cursor": "not-a-cursor"})
+        passed = response.status_code == 400 and response.json()["error_code"] == "INVALID_CURSOR"
+        print_result("Malformed cursor (expect 400)", passed, response)
+        
+        response = requests.get(f"{BASE_URL}/users", params={"after_id": "99999999999999999999999"})
+        passed = response.status_code == 400 and response.json()["error_code"] == "INVALID_CURSOR"
+        print_result("Out-of-range after_id (expect 400)", passed, response)
+    except Exception as e:
+        print_result("Invalid pagination parameters", False)
+        print(f"  Error: {str(e)}")
+    
+    # Test 22: Export Users
+    print_section("Test 12: Export")
+    try:
+        total = requests.get(f"{BASE_URL}/users", params={"limit": 1000}).json()["data"]["count"]
+        
+        response = requests.get(f"{BASE_URL}/users/export")
+        lines = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+        passed = (
+            response.status_code == 200
+            and response.headers.get("Content-Type", "").startswith("application/x-ndjson")
+            and len(lines) == total
+        )
+        print_result("Export users as NDJSON", passed, response)
+        
+        response = requests.get(f"{BASE_URL}/users/export", params={"format": "json", "role": "admin"})
+        users = response.json()["data"]["users"]
+        passed = response.status_code == 200 and users and all(u["role"] == "admin" for u in users)
+        print_result("Export admins as JSON", passed, response)
+        
+        response = requests.get(f"{BASE_URL}/users/export", params={"format": "xml"})
+        passed = response.status_code == 400 and response.json()["error_code"] == "INVALID_FORMAT"
+        print_result("Export with unknown format (expect 400)", passed, response)
+    except Exception as e:
+        print_result("Export users", False)
+        print(f"  Error: {str(e)}")
+    
+    # Test 23: Bulk Create
+    print_section("Test 13: Bulk Operations")
+    bulk_ids = []
+    try:
+        response = requests.post(
+            f"{BASE_URL}/users/bulk",
+            headers=user_headers,
+            json=[
+                {"name": "Bulk One", "email": "bulk1@example.com", "age": 30},
+                {"name": "Bulk Two", "email": "bulk2@example.com", "age": 31},
+                {"name": "Ab", "email": "not-an-email", "age": 12},
+                {"name": "Bulk Dup", "email": "john@example.com", "age": 40}
+            ]
+        )
+        results = response.json()["data"]["results"] if response.status_code == 207 else []
+        bulk_ids = [r["user"]["id"] for r in results if r["status"] == "created"]
+        passed = (
+            response.status_code == 207
+            and len(bulk_ids) == 2
+            and len(results[2].get("errors", [])) == 3
+            and results[3]["error_code"] == "DUPLICATE_EMAIL"
+        )
+        print_result("Bulk create with invalid and duplicate users (expect 207)", passed, response)
+        
+        response = requests.post(
+            f"{BASE_URL}/users/bulk",
+            headers={**user_headers, "Content-Type": "application/x-ndjson"},
+            data='{"name": "Bulk Three", "email": "bulk3@example.com", "age": 32}\n'
+        )
+        passed = response.status_code == 201 and response.json()["data"]["created"] == 1
+        if passed:
+            bulk_ids.append(response.json()["data"]["results"][0]["user"]["id"])
+        print_result("Bulk create from NDJSON (expect 201)", passed, response)
+        
+        response = requests.post(f"{BASE_URL}/users/bulk", headers=user_headers, json=[])
+        passed = response.status_code == 400
+        print_result("Bulk create with empty array (expect 400)", passed, response)
+        
+        response = requests.post(f"{BASE_URL}/users/bulk", json=[{"name": "No Token"}])
+        passed = response.status_code == 401
+        print_result("Bulk create without token (expect 401)", passed, response)
+    except Exception as e:
+        print_result("Bulk create", False)
+        print(f"  Error: {str(e)}")
+    
+    # Test 24: Bulk Delete
+    try:
+        response = requests.delete(
+            f"{BASE_URL}/users",
+            headers=user_headers,
+            json={"ids": bulk_ids}
+        )
+        passed = response.status_code == 403
+        print_result("Bulk delete as non-admin (expect 403)", passed, response)
+        
+        response = requests.delete(
+            f"{BASE_URL}/users",
+            headers=admin_headers,
+            json={"ids": [True, 2.9]}
+        )
+        passed = response.status_code == 400 and response.json()["error_code"] == "INVALID_USER_ID"
+        print_result("Bulk delete with non-integer IDs (expect 400)", passed, response)
+        
+        response = requests.delete(
+            f"{BASE_URL}/users",
+            headers=admin_headers,
+            json={"ids": bulk_ids + [999999]}
+        )
+        data = response.json().get("data", {})
+        passed = (
+            response.status_code == 200
+            and bool(bulk_ids)
+            and data.get("count") == len(bulk_ids)
+            and data.get("not_found") == [999999]
+        )
+        print_result("Bulk delete as admin (expect 200)", passed, response)
+    except Exception as e:
+        print_result("Bulk delete", False)
+        print(f"  Error: {str(e)}")
+    
+    # Test 25: Conditional Requests
+    print_section("Test 14: Conditional Requests")
+    try:
+        response = requests.get(f"{BASE_URL}/users/2")
+        etag = response.headers.get("ETag")
+        response = requests.get(f"{BASE_URL}/users/2", headers={"If-None-Match": etag})
+        passed = bool(etag) and response.status_code == 304 and response.headers.get("ETag") == etag
+        print_result("Get user with matching ETag (expect 304)", passed, response)
+        
+        response = requests.get(f"{BASE_URL}/users?limit=5")
+        list_etag = response.headers.get("ETag")
+        response = requests.get(f"{BASE_URL}/users?limit=5", headers={"If-None-Match": list_etag})
+        passed = bool(list_etag) and response.status_code == 304
+        print_result("Get users with matching ETag (expect 304)", passed, response)
+        
+        name = requests.get(f"{BASE_URL}/users/2").json()["data"]["name"]
+        requests.put(f"{BASE_URL}/users/2", headers=admin_headers, json={"name": "Etag Changed"})
+        response = requests.get(f"{BASE_URL}/users/2", headers={"If-None-Match": etag})
+        passed = response.status_code == 200 and response.headers.get("ETag") != etag
+        print_result("Get user with ETag from before an update (expect 200)", passed, response)
+        
+        response = requests.get(f"{BASE_URL}/users?limit=5", headers={"If-None-Match": list_etag})
+        passed = response.status_code == 200
+        print_result("Get users with ETag from before an update (expect 200)", passed, response)
+        requests.put(f"{BASE_URL}/users/2", headers=admin_headers, json={"name": name})
+    except Exception as e:
+        print_result("Conditional requests", False)
+        print(f"  Error: {str(e)}")
+    
+    # Test 26: Sparse Fieldsets
+    print_section("Test 15: Sparse Fieldsets")
+    try:
+        response = requests.get(f"{BASE_URL}/users/1?fields=id,email")
+        passed = response.status_code == 200 and set(response.json()["data"]) == {"id", "email"}
+        print_result("Get user with fields=id,email", passed, response)
+        
+        response = requests.get(f"{BASE_URL}/users?fields=id,role&limit=5")
+        users = response.json()["data"]["users"] if response.status_code == 200 else []
+        passed = bool(users) and all(set(user) == {"id", "role"} for user in users)
+        print_result("Get users with fields=id,role", passed, response)
+        
+        response = requests.get(f"{BASE_URL}/users/1?fields=id,password")
+        passed = response.status_code == 400 and response.json()["error_code"] == "INVALID_FIELDS"
+        print_result("Get user with unknown field (expect 400)", passed, response)
+    except Exception as e:
+        print_result("Sparse fieldsets", False)
+        print(f"  Error: {str(e)}")
+    
+    # Test 27: CORS Preflight
+    print_section("Test 16: CORS")
+    try:
+        response = requests.options(
+            f"{BASE_URL}/users",
+            headers={
+                "Origin": "http://example.com",
+                "Access-Control-Request-Method": "POST",
+                "Access-Control-Request-Headers": "Authorization"
+            }
+        )
+        allowed_methods = response.headers.get("Access-Control-Allow-Methods", "")
+        allowed_headers = response.headers.get("Access-Control-Allow-Headers", "")
+        passed = (
+            response.status_code == 200
+            and response.headers.get("Access-Control-Allow-Origin") == "http://example.com"
+            and "POST" in allowed_methods
+            and "authorization" in allowed_headers.lower()
+        )
+        print_result("Preflight for POST /users with Authorization", passed, response)
+        
+        response = requests.get(f"{BASE_URL}/health", headers={"Origin": "http://example.com"})
+        passed = response.headers.get("Access-Control-Allow-Origin") == "http://example.com"
+        print_result("CORS headers on a simple request", passed, response)
+    except Exception as e:
+        print_result("CORS", False)
+        print(f"  Error: {str(e)}")
+    
+    # Test 28: JWKS
+    print_section("Test 17: JWKS")
+    try:
+        response = requests.get(f"{BASE_URL}/.well-known/jwks.json")
+        keys = response.json().get("keys") if response.status_code == 200 else None
+        passed = isinstance(keys, list)
+        print_result("Get JWKS", passed, response)
+        
+        # HS256 publishes no keys; with an asymmetric key the token's kid must be listed
+        if keys:
+            header = admin_token.split(".")[0]
+            header = json.loads(base64.urlsafe_b64decode(header + "=" * (-len(header) % 4)))
+            passed = header.get("kid") in [key.get("kid") for key in keys]
+            print_result("Token kid is in the JWKS", passed)
+    except Exception as e:
+        print_result("JWKS", False)
+        print(f"  Error: {str(e)}")
+    
     # Summary
     print("\n" + "#"*60)
     print("  Test Suite Complete")
@@ -2,135 +2,299 @@
 Input validation functions for the API
 """
 import re
-from email_validator import validate_email, EmailNotValidError
+import base64
+import binascii
+from collections import namedtuple
+
+from cache import LRUCache
 
 class ValidationError(Exception):
     """Custom validation error exception"""
-    def __init__(self, message, error_code="VALIDATION_ERROR"):
+    def __init__(self, message, error_code="VALIDATION_ERROR", errors=None):
         self.message = message
         self.error_code = error_code
+        self.errors = errors
         super().__init__(self.message)
 
 
-def validate_user_data(data, is_update=False):
+# Plain ASCII addresses whose normalized form is known without running
+# email_validator: dot-atom local part, LDH domain labels, alphabetic TLD.
+# Labels containing "--" (e.g. IDNA "xn--") take the full path.
+_SIMPLE_EMAIL = re.compile(
+    r"[A-Za-z0-9_%+-]+(?:\.[A-Za-z0-9_%+-]+)*"
+    r"@((?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63})"
+)
+_SPECIAL_USE_TLDS = frozenset(["arpa", "invalid", "local", "localhost", "onion", "test"])
+
+# RFC 2142 mailbox names that email_validator lowercases (its
+# CASE_INSENSITIVE_MAILBOX_NAMES, copied as-is so importing this module does
+# not pull in email_validator); such addresses take the full path.
+_CASE_INSENSITIVE_MAILBOX_NAMES = frozenset([
+    "info", "marking", "sales", "support",
+    "abuse", "noc", "security",
+    "postmaster", "hostmaster", "usenet", "news", "webmaster", "www", "uucp", "ftp",
+])
+
+# Raw address -> normalized address, or False if invalid
+email_cache = LRUCache(max_size=10000, ttl=float("inf"))
+email_stats = {"fast_path": 0, "full_validations": 0}
+
+
+def _fast_normalize_email(email):
+    """Return the normalized form of an obviously valid ASCII address, else None"""
+    if len(email) > 254:
+        return None
+    match = _SIMPLE_EMAIL.fullmatch(email)
+    if match is None:
+        return None
+    domain = match.group(1)
+    local_part = email[:match.start(1) - 1]
+    if len(local_part) > 64 or len(domain) > 253 or "--" in domain:
+        return None
+    if local_part.lower() in _CASE_INSENSITIVE_MAILBOX_NAMES:
+        return None
+    domain = domain.lower()
+    if domain.rpartition(".")[2] in _SPECIAL_USE_TLDS:
+        return None
+    return f"{local_part}@{domain}"
+
+
+def normalize_email(email):
     """
-    Validate user data for create/update operations
+    Validate an email address and return its normalized form
+    
+    Results (including rejections) are memoized in email_cache. Plain ASCII
+    addresses are normalized by a precompiled pattern; anything else goes
+    through email_validator, which is imported on first use so that
+    importing this module stays cheap at start-up.
+    
+    Raises:
+        ValidationError: If the address is not valid
+    """
+    normalized = _lookup_email(email)
+    if normalized is False:
+        raise ValidationError(
+            "Invalid email format",
+            error_code="INVALID_EMAIL"
+        )
+    return normalized
+
+
+def _lookup_email(email):
+    """Return the normalized address, or False if it is invalid"""
+    normalized = email_cache.get(email)
+    if normalized is None:
+        normalized = _fast_normalize_email(email)
+        if normalized is not None:
+            email_stats["fast_path"] += 1
+        else:
+            email_stats["full_validations"] += 1
+            from email_validator import validate_email, EmailNotValidError
+            
+            try:
+                normalized = validate_email(email, check_deliverability=False).normalized
+            except EmailNotValidError:
+                normalized = False
+        email_cache.set(email, normalized)
+    return normalized
+
+
+def email_validation_stats():
+    """Return memo hit/miss counters and how the misses were validated"""
+    return dict(email_cache.stats(), **email_stats)
+
+
+# One problem with one field, as collected by _check_user
+FieldError = namedtuple("FieldError", ["field", "error_code", "message"])
+
+# Marks a field absent from the input
+_ABSENT = object()
+
+# Errors reported by _check_user, built once
+_MISSING = {
+    field: FieldError(field, "MISSING_FIELD", f"Missing required field: {field}")
+    for field in ("name", "email", "age")
+}
+_NAME_TOO_SHORT = FieldError("name", "INVALID_NAME", "Name must be at least 3 characters long")
+_NAME_TOO_LONG = FieldError("name", "INVALID_NAME", "Name must be less than 100 characters")
+_EMAIL_INVALID = FieldError("email", "INVALID_EMAIL", "Invalid email format")
+_AGE_INVALID = FieldError("age", "INVALID_AGE", "Age must be a valid integer")
+_AGE_TOO_SMALL = FieldError("age", "INVALID_AGE", "Age must be 18 or older")
+_AGE_TOO_LARGE = FieldError("age", "INVALID_AGE", "Age must be less than 150")
+_ROLE_INVALID = FieldError("role", "INVALID_ROLE", "Role must be either 'admin' or 'user'")
+
+_ROLES = frozenset(["admin", "user"])
+
+
+def _check_user(data, required):
+    """
+    Validate one user payload in a single pass, collecting every error
+    
+    Each value is converted and stripped once and nothing is raised, so the
+    common all-valid payload of str and int values costs less than the
+    previous field-by-field checks, which converted required fields twice.
     
     Args:
         data: Dictionary containing user data
-        is_update: Boolean indicating if this is an update operation
+        required: Whether name, email and age must be present (create)
     
     Returns:
-        Dictionary of validated data
-    
-    Raises:
-        ValidationError: If validation fails
+        Tuple of (validated dict, list of FieldError). Missing required
+        fields are listed first, then invalid fields in name, email, age,
+        role order; a missing field is not checked further.
     """
     validated = {}
+    errors = []
+    missing = None
     
-    # For create, all fields are required. For update, fields are optional
-    if not is_update:
-        required_fields = ["name", "email", "age"]
-        for field in required_fields:
-            if field not in data or data[field] is None or str(data[field]).strip() == "":
-                raise ValidationError(
-                    f"Missing required field: {field}",
-                    error_code="MISSING_FIELD"
-                )
-    
-    # Validate name
-    if "name" in data:
-        name = str(data["name"]).strip()
-        if len(name) < 3:
-            raise ValidationError(
-                "Name must be at least 3 characters long",
-                error_code="INVALID_NAME"
-            )
-        if len(name) > 100:
-            raise ValidationError(
-                "Name must be less than 100 characters",
-                error_code="INVALID_NAME"
-            )
-        validated["name"] = name
+    # Name
+    value = data.get("name", _ABSENT)
+    if value is _ABSENT or (value is None and required):
+        if required:
+            missing = [_MISSING["name"]]
+    else:
+        value = (value if value.__class__ is str else str(value)).strip()
+        if not value and required:
+            missing = [_MISSING["name"]]
+        elif len(value) < 3:
+            errors.append(_NAME_TOO_SHORT)
+        elif len(value) > 100:
+            errors.append(_NAME_TOO_LONG)
+        else:
+            validated["name"] = value
     
-    # Validate email
-    if "email" in data:
-        email = str(data["email"]).strip()
-        try:
-            # Validate email format
-            email_info = validate_email(email, check_deliverability=False)
-            validated["email"] = email_info.normalized
-        except EmailNotValidError as e:
-            raise ValidationError(
-                "Invalid email format",
-                error_code="INVALID_EMAIL"
-            )
+    # Email
+    value = data.get("email", _ABSENT)
+    if value is _ABSENT or (value is None and required):
+        if required:
+            missing = (missing or []) + [_MISSING["email"]]
+    else:
+        value = (value if value.__class__ is str else str(value)).strip()
+        if not value and required:
+            missing = (missing or []) + [_MISSING["email"]]
+        else:
+            email = _lookup_email(value)
+            if email is False:
+                errors.append(_EMAIL_INVALID)
+            else:
+                validated["email"] = email
     
-    # Validate age
-    if "age" in data:
-        try:
-            age = int(data["age"])
-            if age < 18:
-                raise ValidationError(
-                    "Age must be 18 or older",
-                    error_code="INVALID_AGE"
-                )
-            if age > 150:
-                raise ValidationError(
-                    "Age must be less than 150",
-                    error_code="INVALID_AGE"
-                )
-            validated["age"] = age
-        except (ValueError, TypeError):
-            raise ValidationError(
-                "Age must be a valid integer",
-                error_code="INVALID_AGE"
-            )
+    # Age
+    value = data.get("age", _ABSENT)
+    if value is _ABSENT or (value is None and required):
+        if required:
+            missing = (missing or []) + [_MISSING["age"]]
+    elif required and value.__class__ is str and not value.strip():
+        missing = (missing or []) + [_MISSING["age"]]
+    else:
+        if value.__class__ is not int:
+            try:
+                value = int(value)
+            except (ValueError, TypeError):
+                value = None
+        if value is None:
+            errors.append(_AGE_INVALID)
+        elif value < 18:
+            errors.append(_AGE_TOO_SMALL)
+        elif value > 150:
+            errors.append(_AGE_TOO_LARGE)
+        else:
+            validated["age"] = value
     
-    # Validate role
-    if "role" in data:
-        role = str(data["role"]).strip().lower()
-        if role not in ["admin", "user"]:
-            raise ValidationError(
-                "Role must be either 'admin' or 'user'",
-                error_code="INVALID_ROLE"
-            )
-        validated["role"] = role
+    # Role (optional)
+    value = data.get("role", _ABSENT)
+    if value is not _ABSENT:
+        value = (value if value.__class__ is str else str(value)).strip().lower()
+        if value in _ROLES:
+            validated["role"] = value
+        else:
+            errors.append(_ROLE_INVALID)
     
-    return validated
+    if missing:
+        return validated, missing + errors
+    return validated, errors
 
 
-def validate_login_data(data):
+def field_errors(errors):
+    """Convert FieldErrors to the dicts returned in API responses"""
+    return [
+        {"field": field, "error_code": error_code, "message": message}
+        for field, error_code, message in errors
+    ]
+
+
+def validate_user_records(records, is_update=False):
     """
-    Validate login data
+    Validate many user records, reporting every field error of each
     
     Args:
-        data: Dictionary containing login credentials
+        records: Iterable of dicts
+        is_update: Boolean indicating if these are update payloads
+    
+    Returns:
+        List of (validated dict, list of FieldError) per record
+    """
+    required = not is_update
+    return [_check_user(record, required) for record in records]
+
+
+def validate_user_data(data, is_update=False):
+    """
+    Validate user data for create/update operations
+    
+    Args:
+        data: Dictionary containing user data
+        is_update: Boolean indicating if this is an update operation
     
     Returns:
         Dictionary of validated data
     
     Raises:
-        ValidationError: If validation fails
+        ValidationError: If validation fails, with the first problem as its
+            message and every field error in its errors attribute
+    """
+    if not isinstance(data, dict):
+        data = {}
+    
+    validated, errors = _check_user(data, not is_update)
+    if errors:
+        raise ValidationError(
+            errors[0].message,
+            error_code=errors[0].error_code,
+            errors=field_errors(errors)
+        )
+    return validated
+
+
+def login_email(data):
+    """
+    Return the email of a login body exactly as submitted (as a string)
+    
+    Raises:
+        ValidationError: If the body is not an object with an email
     """
-    if "email" not in data or not data["email"]:
+    if not isinstance(data, dict) or not data.get("email"):
         raise ValidationError(
             "Missing required field: email",
             error_code="MISSING_FIELD"
         )
+    return str(data["email"])
+
+
+def validate_login_data(data):
+    """
+    Validate login data
     
-    email = str(data["email"]).strip()
+    Args:
+        data: Dictionary containing login credentials
     
-    try:
-        email_info = validate_email(email, check_deliverability=False)
-        validated_email = email_info.normalized
-    except EmailNotValidError:
-        raise ValidationError(
-            "Invalid email format",
-            error_code="INVALID_EMAIL"
-        )
+    Returns:
+        Dictionary of validated data
     
-    return {"email": validated_email}
+    Raises:
+        ValidationError: If validation fails
+    """
+    return {"email": normalize_email(login_email(data).strip())}
 
 
 def validate_user_id(user_id_str):
@@ -159,3 +323,144 @@ def validate_user_id(user_id_str):
             "User ID must be a valid integer",
             error_code="INVALID_USER_ID"
         )
+
+
+# Largest value a SQLite INTEGER can hold; larger cursors cannot be bound
+MAX_CURSOR_ID = 2 ** 63 - 1
+
+
+def encode_cursor(last_id):
+    """
+    Encode the last seen user ID into an opaque pagination cursor
+    
+    Args:
+        last_id: ID of the last user on the current page
+    
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"id:{last_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode an opaque pagination cursor back into a user ID
+    
+    Args:
+        cursor: Cursor string previously returned as next_cursor
+    
+    Returns:
+        Integer user ID to continue after
+    
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii")
+        prefix, _, value = raw.partition(":")
+        if prefix != "id":
+            raise ValueError(raw)
+        after_id = int(value)
+        if after_id < 0 or after_id > MAX_CURSOR_ID:
+            raise ValueError(raw)
+        return after_id
+    except (ValueError, UnicodeError, binascii.Error):
+        raise ValidationError(
+            "Invalid pagination cursor",
+            error_code="INVALID_CURSOR"
+        )
+
+
+def validate_pagination_params(args, default_limit=100, max_limit=1000):
+    """
+    Validate keyset pagination query parameters
+    
+    Args:
+        args: Query parameter mapping (limit, after_id, cursor)
+        default_limit: Page size used when limit is not provided
+        max_limit: Largest page size a caller may request
+    
+    Returns:
+        Tuple of (limit, after_id)
+    
+    Raises:
+        ValidationError: If validation fails
+    """
+    limit = args.get("limit")
+    if limit is None or str(limit).strip() == "":
+        limit = default_limit
+    else:
+        try:
+            limit = int(limit)
+        except (ValueError, TypeError):
+            raise ValidationError(
+                "Limit must be a valid integer",
+                error_code="INVALID_LIMIT"
+            )
+        if limit < 1 or limit > max_limit:
+            raise ValidationError(
+                f"Limit must be between 1 and {max_limit}",
+                error_code="INVALID_LIMIT"
+            )
+    
+    cursor = args.get("cursor")
+    after_id = args.get("after_id")
+    
+    if cursor:
+        return limit, decode_cursor(cursor)
+    
+    if after_id is None or str(after_id).strip() == "":
+        return limit, None
+    
+    try:
+        after_id = int(after_id)
+        if after_id < 0 or after_id > MAX_CURSOR_ID:
+            raise ValueError(after_id)
+    except (ValueError, TypeError):
+        raise ValidationError(
+            f"after_id must be an integer between 0 and {MAX_CURSOR_ID}",
+            error_code="INVALID_CURSOR"
+        )
+    
+    return limit, after_id
+
+
+def validate_fields(fields_str, allowed_fields):
+    """
+    Validate a sparse fieldset such as "id,email,role"
+    
+    Args:
+        fields_str: Comma-separated field names (or None)
+        allowed_fields: Field names that may be requested
+    
+    Returns:
+        List of unique field names in request order, or None if no
+        fieldset was requested
+    
+    Raises:
+        ValidationError: If a field is unknown or the list is empty
+    """
+    if fields_str is None:
+        return None
+    
+    fields = []
+    for field in fields_str.split(","):
+        field = field.strip()
+        if not field or field in fields:
+            continue
+        if field not in allowed_fields:
+            raise ValidationError(
+                f"Unknown field: {field}. Allowed fields: {', '.join(allowed_fields)}",
+                error_code="INVALID_FIELDS"
+            )
+        fields.append(field)
+    
+    if not fields:
+        raise ValidationError(
+            "fields must name at least one field",
+            error_code="INVALID_FIELDS"
+        )
+    
+    return fields
@@ -0,0 +1,52 @@
+"""
+Lazy WSGI entry point for API Backend
+
+Importing this module is nearly free: Flask, SQLAlchemy, the JWT and CORS
+extensions and the database are only loaded when the first request
+arrives (or when load_app() is called), so a serverless or autoscaled
+process can accept work as soon as it starts.
+    
+    gunicorn wsgi:app
+"""
+from threading import Lock
+
+
+def load_app(init_schema=False):
+    """
+    Import the application module and return its Flask app
+    
+    app.py builds a single module-level app, so this is not a factory:
+    every call returns that same instance.
+    
+    Args:
+        init_schema: Create tables and seed data now instead of on the
+            first request
+    """
+    from app import app, ensure_schema
+    
+    if init_schema:
+        ensure_schema()
+    return app
+
+
+class LazyApplication:
+    """WSGI callable that loads the real app on its first request"""
+    
+    def __init__(self, loader):
+        self._loader = loader
+        self._app = None
+        self._lock = Lock()
+    
+    def load(self):
+        """Load the app if it has not been loaded yet, and return it"""
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    self._app = self._loader()
+        return self._app
+    
+    def __call__(self, environ, start_response):
+        return self.load()(environ, start_response)
+
+
+app = LazyApplication(load_app)